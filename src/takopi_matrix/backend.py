@@ -291,7 +291,7 @@ class MatrixBackend(TransportBackend):
         cfg = MatrixBridgeConfig(
             client=client,
             runtime=runtime,
-            room_ids=room_ids,
+            room_ids=tuple(room_ids),
             user_allowlist=user_allowlist,
             startup_msg=startup_msg,
             exec_cfg=exec_cfg,
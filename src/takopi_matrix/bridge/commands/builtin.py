@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import os
+import stat
+from collections.abc import Awaitable, Callable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal
 
+import anyio
 from takopi.api import (
     ConfigError,
     DirectiveError,
     MessageRef,
     RenderedMessage,
+    ResolvedMessage,
     RunContext,
     SendOptions,
+    TransportRuntime,
 )
 from takopi.telegram.files import (
     ZipTooLargeError,
@@ -35,7 +41,7 @@ from ...engine_overrides import (
     supports_reasoning,
 )
 from ...trigger_mode import resolve_trigger_mode
-from ...types import MatrixIncomingMessage
+from ...types import MatrixFile, MatrixIncomingMessage
 from .parse import split_command_args
 
 if TYPE_CHECKING:
@@ -78,6 +84,9 @@ FILE_DEFAULT_DENY_GLOBS: tuple[str, ...] = (
     "**/*.key",
 )
 FILE_DEFAULT_UPLOADS_DIR = "uploads"
+FILE_PUT_MAX_IN_FLIGHT = 4
+# Parsing <=256 chars of directives takes microseconds, less than a thread hop.
+RESOLVE_MESSAGE_THREAD_THRESHOLD = 256
 
 ENGINE_SOURCE_LABELS = {
     "directive": "directive",
@@ -92,6 +101,62 @@ OVERRIDE_SOURCE_LABELS = {
     "default": "default",
 }
 
+AGENT_SHOW_TEMPLATE = (
+    "engine: {engine} ({source})\n\n"
+    "defaults: thread: {thread}, room: {room}, project: {project}, global: {default}\n\n"
+    "available: {available}"
+)
+MODEL_SHOW_TEMPLATE = (
+    "engine: {engine} ({engine_source})\n\n"
+    "model: {value} ({source})\n\n"
+    "defaults: thread: {thread}, room: {room}\n\n"
+    "available engines: {available}"
+)
+REASONING_SHOW_TEMPLATE = (
+    "engine: {engine} ({engine_source})\n\n"
+    "reasoning: {value} ({source})\n\n"
+    "defaults: thread: {thread}, room: {room}\n\n"
+    "available levels: {available}"
+)
+TRIGGER_SHOW_TEMPLATE = (
+    "trigger: {mode} ({source})\n\n"
+    "defaults: thread: {thread}, room: {room}\n\n"
+    "available: all, mentions"
+)
+_REASONING_LEVELS_TEXT = ", ".join(allowed_reasoning_levels())
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedCommand:
+    tokens: tuple[str, ...]
+    action: str
+
+
+type _ActionHandler = Callable[
+    [MatrixBridgeConfig, MatrixIncomingMessage, ParsedCommand, RunContext | None],
+    Awaitable[None],
+]
+
+
+@dataclass(frozen=True, slots=True)
+class ReplyCtx:
+    """Reply target for a command message, built once per handler."""
+
+    cfg: MatrixBridgeConfig
+    room_id: str
+    options: SendOptions
+
+    @classmethod
+    def for_message(
+        cls, cfg: MatrixBridgeConfig, msg: MatrixIncomingMessage
+    ) -> ReplyCtx:
+        reply_ref = MessageRef(channel_id=msg.room_id, message_id=msg.event_id)
+        return cls(
+            cfg=cfg,
+            room_id=msg.room_id,
+            options=SendOptions(reply_to=reply_ref, notify=True),
+        )
+
 
 @dataclass(frozen=True, slots=True)
 class CtxSetParseResult:
@@ -105,6 +170,28 @@ class OverrideSetArgs:
     value: str | None
 
 
+@dataclass(frozen=True, slots=True)
+class _SetModel:
+    value: str | None
+
+    def __call__(self, current: EngineOverrides | None) -> EngineOverrides:
+        return EngineOverrides(
+            model=self.value,
+            reasoning=current.reasoning if current is not None else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _SetReasoning:
+    value: str | None
+
+    def __call__(self, current: EngineOverrides | None) -> EngineOverrides:
+        return EngineOverrides(
+            model=current.model if current is not None else None,
+            reasoning=self.value,
+        )
+
+
 def _request_process_restart() -> None:
     """Request process restart via graceful shutdown path.
 
@@ -118,24 +205,16 @@ def _request_process_restart() -> None:
     raise KeyboardInterrupt
 
 
-async def _reply(
-    cfg: MatrixBridgeConfig,
-    *,
-    room_id: str,
-    event_id: str,
-    text: str,
-    notify: bool = True,
-) -> None:
-    reply_to = MessageRef(channel_id=room_id, message_id=event_id)
-    await cfg.exec_cfg.transport.send(
-        channel_id=room_id,
+async def _reply(rctx: ReplyCtx, text: str) -> None:
+    await rctx.cfg.exec_cfg.transport.send(
+        channel_id=rctx.room_id,
         message=RenderedMessage(text=text),
-        options=SendOptions(reply_to=reply_to, notify=notify),
+        options=rctx.options,
     )
 
 
 async def _require_admin_or_private(
-    cfg: MatrixBridgeConfig,
+    rctx: ReplyCtx,
     msg: MatrixIncomingMessage,
     *,
     missing_sender: str,
@@ -143,26 +222,17 @@ async def _require_admin_or_private(
     denied: str,
     allow_private: bool = True,
 ) -> bool:
+    cfg = rctx.cfg
     sender = msg.sender.strip() if isinstance(msg.sender, str) else ""
     if not sender:
-        await _reply(
-            cfg,
-            room_id=msg.room_id,
-            event_id=msg.event_id,
-            text=missing_sender,
-        )
+        await _reply(rctx, missing_sender)
         return False
 
     # If allowlist is configured, it is authoritative.
     if cfg.user_allowlist is not None:
         if sender in cfg.user_allowlist:
             return True
-        await _reply(
-            cfg,
-            room_id=msg.room_id,
-            event_id=msg.event_id,
-            text=denied,
-        )
+        await _reply(rctx, denied)
         return False
 
     if allow_private:
@@ -172,24 +242,49 @@ async def _require_admin_or_private(
 
     is_admin = await cfg.client.is_room_admin(msg.room_id, sender)
     if is_admin is None:
-        await _reply(
-            cfg,
-            room_id=msg.room_id,
-            event_id=msg.event_id,
-            text=failed_member,
-        )
+        await _reply(rctx, failed_member)
         return False
     if is_admin:
         return True
-    await _reply(
-        cfg,
-        room_id=msg.room_id,
-        event_id=msg.event_id,
-        text=denied,
-    )
+    await _reply(rctx, denied)
     return False
 
 
+def _parse_command(args_text: str) -> ParsedCommand:
+    tokens = split_command_args(args_text)
+    action = tokens[0].lower() if tokens else "show"
+    return ParsedCommand(tokens=tokens, action=action)
+
+
+@lru_cache(maxsize=8)
+def _lowered_engine_ids(engine_ids: tuple[str, ...]) -> frozenset[str]:
+    return frozenset(engine.lower() for engine in engine_ids)
+
+
+def _engine_ids_lower(runtime: TransportRuntime) -> frozenset[str]:
+    # Keyed on the id tuple, not the runtime: TransportRuntime.update() swaps
+    # the router in place on config reload.
+    return _lowered_engine_ids(runtime.engine_ids)
+
+
+async def _resolve_message(
+    cfg: MatrixBridgeConfig,
+    *,
+    text: str,
+    reply_text: str | None,
+    ambient_context: RunContext | None,
+) -> ResolvedMessage:
+    resolve = partial(
+        cfg.runtime.resolve_message,
+        text=text,
+        reply_text=reply_text,
+        ambient_context=ambient_context,
+    )
+    if len(text) + len(reply_text or "") <= RESOLVE_MESSAGE_THREAD_THRESHOLD:
+        return resolve()
+    return await anyio.to_thread.run_sync(resolve)
+
+
 def _format_context(runtime, context: RunContext | None) -> str:
     if context is None or context.project is None:
         return "none"
@@ -201,11 +296,10 @@ def _format_context(runtime, context: RunContext | None) -> str:
 
 def _parse_ctx_set_args(
     *,
-    args_text: str,
+    tokens: tuple[str, ...],
     runtime,
     default_project: str | None,
 ) -> CtxSetParseResult:
-    tokens = split_command_args(args_text)
     if not tokens:
         return CtxSetParseResult(None, CTX_USAGE)
     if len(tokens) > 2:
@@ -237,7 +331,7 @@ def _parse_ctx_set_args(
 
 
 def _parse_override_set_args(
-    tokens: tuple[str, ...], *, engine_ids: set[str]
+    tokens: tuple[str, ...], *, engine_ids: frozenset[str]
 ) -> OverrideSetArgs:
     # tokens include the "set" action at index 0.
     if len(tokens) == 2:
@@ -301,699 +395,605 @@ async def _apply_override_update(
 ) -> Literal["thread", "room"] | None:
     thread_root = _thread_scope(msg, cfg)
     if thread_root is not None:
-        current = await cfg.thread_state.get_engine_override(
-            msg.room_id, thread_root, engine
-        )
-        await cfg.thread_state.set_engine_override(
-            msg.room_id, thread_root, engine, update(current)
+        await cfg.thread_state.update_engine_override(
+            msg.room_id, thread_root, engine, update
         )
         return "thread"
     if cfg.room_prefs is None:
         return None
-    current = await cfg.room_prefs.get_engine_override(msg.room_id, engine)
-    await cfg.room_prefs.set_engine_override(msg.room_id, engine, update(current))
+    await cfg.room_prefs.update_engine_override(msg.room_id, engine, update)
     return "room"
 
 
-async def _handle_ctx_command(
+async def _dispatch_action(
+    actions: Mapping[str, _ActionHandler],
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
-    args_text: str,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+    *,
+    unknown_text: str,
+) -> None:
+    handler = actions.get(command.action)
+    if handler is None:
+        await _reply(ReplyCtx.for_message(cfg, msg), unknown_text)
+        return
+    await handler(cfg, msg, command, ambient_context)
+
+
+async def _ctx_show(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
     ambient_context: RunContext | None,
 ) -> None:
-    tokens = split_command_args(args_text)
-    action = tokens[0].lower() if tokens else "show"
+    rctx = ReplyCtx.for_message(cfg, msg)
     room_id = msg.room_id
-    event_id = msg.event_id
     thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        bound = await cfg.thread_state.get_context(room_id, thread_root)
+        scope = "thread"
+    elif cfg.room_prefs is not None:
+        bound = await cfg.room_prefs.get_context(room_id)
+        scope = "room"
+    else:
+        bound = None
+        scope = "room"
+    resolved = await _resolve_message(
+        cfg,
+        text="",
+        reply_text=msg.reply_to_text,
+        ambient_context=ambient_context,
+    )
+    source = (
+        "bound"
+        if bound is not None and resolved.context_source == "ambient"
+        else resolved.context_source
+    )
+    lines = [
+        f"scope: {scope}",
+        f"bound ctx: {_format_context(cfg.runtime, bound)}",
+        f"resolved ctx: {_format_context(cfg.runtime, resolved.context)} (source: {source})",
+    ]
+    if bound is None:
+        lines.append("note: no bound context for this scope")
+    await _reply(rctx, "\n".join(lines))
 
-    if action in {"show", ""}:
-        if thread_root is not None:
-            bound = await cfg.thread_state.get_context(room_id, thread_root)
-            scope = "thread"
-        elif cfg.room_prefs is not None:
-            bound = await cfg.room_prefs.get_context(room_id)
-            scope = "room"
-        else:
-            bound = None
-            scope = "room"
-        resolved = cfg.runtime.resolve_message(
-            text="",
-            reply_text=msg.reply_to_text,
-            ambient_context=ambient_context,
-        )
-        source = (
-            "bound"
-            if bound is not None and resolved.context_source == "ambient"
-            else resolved.context_source
-        )
-        lines = [
-            f"scope: {scope}",
-            f"bound ctx: {_format_context(cfg.runtime, bound)}",
-            f"resolved ctx: {_format_context(cfg.runtime, resolved.context)} (source: {source})",
-        ]
-        if bound is None:
-            lines.append("note: no bound context for this scope")
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="\n".join(lines))
-        return
 
-    if action == "set":
-        default_project = (
-            ambient_context.project if ambient_context is not None else None
-        )
-        parsed = _parse_ctx_set_args(
-            args_text=" ".join(tokens[1:]),
-            runtime=cfg.runtime,
-            default_project=default_project,
-        )
-        if parsed.error is not None or parsed.context is None:
-            suffix = f"\n{CTX_USAGE}" if parsed.error != CTX_USAGE else ""
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"error:\n{parsed.error}{suffix}",
-            )
-            return
-        if thread_root is not None:
-            await cfg.thread_state.set_context(room_id, thread_root, parsed.context)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"thread bound to `{_format_context(cfg.runtime, parsed.context)}`",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room context store unavailable.",
-            )
-            return
-        await cfg.room_prefs.set_context(room_id, parsed.context)
+async def _ctx_set(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    room_id = msg.room_id
+    default_project = ambient_context.project if ambient_context is not None else None
+    parsed = _parse_ctx_set_args(
+        tokens=command.tokens[1:],
+        runtime=cfg.runtime,
+        default_project=default_project,
+    )
+    if parsed.error is not None or parsed.context is None:
+        suffix = f"\n{CTX_USAGE}" if parsed.error != CTX_USAGE else ""
+        await _reply(rctx, f"error:\n{parsed.error}{suffix}")
+        return
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.set_context(room_id, thread_root, parsed.context)
         await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"room bound to `{_format_context(cfg.runtime, parsed.context)}`",
+            rctx, f"thread bound to `{_format_context(cfg.runtime, parsed.context)}`"
         )
         return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room context store unavailable.")
+        return
+    await cfg.room_prefs.set_context(room_id, parsed.context)
+    await _reply(
+        rctx, f"room bound to `{_format_context(cfg.runtime, parsed.context)}`"
+    )
 
-    if action == "clear":
-        if thread_root is not None:
-            await cfg.thread_state.clear_context(room_id, thread_root)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="thread context cleared.",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room context store unavailable.",
-            )
-            return
-        await cfg.room_prefs.clear_context(room_id)
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="room context cleared.",
-        )
+
+async def _ctx_clear(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    room_id = msg.room_id
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.clear_context(room_id, thread_root)
+        await _reply(rctx, "thread context cleared.")
+        return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room context store unavailable.")
         return
+    await cfg.room_prefs.clear_context(room_id)
+    await _reply(rctx, "room context cleared.")
 
-    await _reply(
+
+_CTX_ACTIONS: dict[str, _ActionHandler] = {
+    "show": _ctx_show,
+    "": _ctx_show,
+    "set": _ctx_set,
+    "clear": _ctx_clear,
+}
+
+
+async def _handle_ctx_command(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    await _dispatch_action(
+        _CTX_ACTIONS,
         cfg,
-        room_id=room_id,
-        event_id=event_id,
-        text="unknown `/ctx` command. use `/ctx`, `/ctx set`, or `/ctx clear`.",
+        msg,
+        command,
+        ambient_context,
+        unknown_text="unknown `/ctx` command. use `/ctx`, `/ctx set`, or `/ctx clear`.",
     )
 
 
 async def _handle_new_command(
     cfg: MatrixBridgeConfig, msg: MatrixIncomingMessage
 ) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
     room_id = msg.room_id
-    event_id = msg.event_id
     thread_root = _thread_scope(msg, cfg)
     if thread_root is not None:
         await cfg.thread_state.clear_sessions(room_id, thread_root)
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="cleared stored sessions for this thread.",
-        )
+        await _reply(rctx, "cleared stored sessions for this thread.")
         return
     if cfg.chat_sessions is None:
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="no stored sessions to clear for this room.",
-        )
+        await _reply(rctx, "no stored sessions to clear for this room.")
         return
     await cfg.chat_sessions.clear_sessions(room_id, msg.sender)
-    await _reply(
-        cfg,
-        room_id=room_id,
-        event_id=event_id,
-        text="cleared stored sessions for you in this room.",
+    await _reply(rctx, "cleared stored sessions for you in this room.")
+
+
+async def _agent_show(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    selection = await _resolve_engine_selection(
+        cfg, msg, ambient_context=ambient_context
+    )
+    text = AGENT_SHOW_TEMPLATE.format(
+        engine=selection.engine,
+        source=ENGINE_SOURCE_LABELS[selection.source],
+        thread=selection.thread_default or "none",
+        room=selection.room_default or "none",
+        project=selection.project_default or "none",
+        default=cfg.runtime.default_engine,
+        available=", ".join(cfg.runtime.engine_ids),
     )
+    await _reply(rctx, text)
 
 
-async def _handle_agent_command(
+async def _agent_set(
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
-    args_text: str,
+    command: ParsedCommand,
     ambient_context: RunContext | None,
 ) -> None:
-    tokens = split_command_args(args_text)
-    action = tokens[0].lower() if tokens else "show"
+    rctx = ReplyCtx.for_message(cfg, msg)
     room_id = msg.room_id
-    event_id = msg.event_id
-    thread_root = _thread_scope(msg, cfg)
-
-    if action in {"show", ""}:
-        selection = await _resolve_engine_selection(
-            cfg, msg, ambient_context=ambient_context
-        )
-        lines = [
-            f"engine: {selection.engine} ({ENGINE_SOURCE_LABELS[selection.source]})",
-            "defaults: "
-            f"thread: {selection.thread_default or 'none'}, "
-            f"room: {selection.room_default or 'none'}, "
-            f"project: {selection.project_default or 'none'}, "
-            f"global: {cfg.runtime.default_engine}",
-            f"available: {', '.join(cfg.runtime.engine_ids)}",
-        ]
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="\n\n".join(lines))
+    tokens = command.tokens
+    if len(tokens) < 2:
+        await _reply(rctx, AGENT_USAGE)
         return
-
-    if action == "set":
-        if len(tokens) < 2:
-            await _reply(cfg, room_id=room_id, event_id=event_id, text=AGENT_USAGE)
-            return
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for engine defaults.",
-            failed_member="failed to verify engine permissions.",
-            denied="changing default engines is restricted to room admins.",
-        ):
-            return
-        engine = tokens[1].strip().lower()
-        if engine not in cfg.runtime.engine_ids:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"unknown engine `{engine}`.\navailable: `{', '.join(cfg.runtime.engine_ids)}`",
-            )
-            return
-        if thread_root is not None:
-            await cfg.thread_state.set_default_engine(room_id, thread_root, engine)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"thread default engine set to `{engine}`",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room defaults store unavailable.",
-            )
-            return
-        await cfg.room_prefs.set_default_engine(room_id, engine)
+    if not await _require_admin_or_private(
+        rctx,
+        msg,
+        missing_sender="cannot verify sender for engine defaults.",
+        failed_member="failed to verify engine permissions.",
+        denied="changing default engines is restricted to room admins.",
+    ):
+        return
+    engine = tokens[1].strip().lower()
+    if engine not in cfg.runtime.engine_ids:
         await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"room default engine set to `{engine}`",
+            rctx,
+            f"unknown engine `{engine}`.\navailable: `{', '.join(cfg.runtime.engine_ids)}`",
         )
         return
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.set_default_engine(room_id, thread_root, engine)
+        await _reply(rctx, f"thread default engine set to `{engine}`")
+        return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room defaults store unavailable.")
+        return
+    await cfg.room_prefs.set_default_engine(room_id, engine)
+    await _reply(rctx, f"room default engine set to `{engine}`")
 
-    if action == "clear":
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for engine defaults.",
-            failed_member="failed to verify engine permissions.",
-            denied="changing default engines is restricted to room admins.",
-        ):
-            return
-        if thread_root is not None:
-            await cfg.thread_state.clear_default_engine(room_id, thread_root)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="thread default engine cleared.",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room defaults store unavailable.",
-            )
-            return
-        await cfg.room_prefs.clear_default_engine(room_id)
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="room default engine cleared.",
-        )
+
+async def _agent_clear(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    room_id = msg.room_id
+    if not await _require_admin_or_private(
+        rctx,
+        msg,
+        missing_sender="cannot verify sender for engine defaults.",
+        failed_member="failed to verify engine permissions.",
+        denied="changing default engines is restricted to room admins.",
+    ):
+        return
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.clear_default_engine(room_id, thread_root)
+        await _reply(rctx, "thread default engine cleared.")
         return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room defaults store unavailable.")
+        return
+    await cfg.room_prefs.clear_default_engine(room_id)
+    await _reply(rctx, "room default engine cleared.")
 
-    await _reply(cfg, room_id=room_id, event_id=event_id, text=AGENT_USAGE)
 
+_AGENT_ACTIONS: dict[str, _ActionHandler] = {
+    "show": _agent_show,
+    "": _agent_show,
+    "set": _agent_set,
+    "clear": _agent_clear,
+}
 
-async def _handle_model_command(
+
+async def _handle_agent_command(
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
-    args_text: str,
+    command: ParsedCommand,
     ambient_context: RunContext | None,
 ) -> None:
-    tokens = split_command_args(args_text)
-    action = tokens[0].lower() if tokens else "show"
-    room_id = msg.room_id
-    event_id = msg.event_id
-    engine_ids = {engine.lower() for engine in cfg.runtime.engine_ids}
+    await _dispatch_action(
+        _AGENT_ACTIONS,
+        cfg,
+        msg,
+        command,
+        ambient_context,
+        unknown_text=AGENT_USAGE,
+    )
 
-    if action in {"show", ""}:
-        selection = await _resolve_engine_selection(
-            cfg, msg, ambient_context=ambient_context
-        )
-        thread_override, room_override = await _read_overrides_for_engine(
-            cfg, msg, selection.engine
-        )
-        resolution = resolve_override_value(
-            thread_override=thread_override,
-            room_override=room_override,
-            field="model",
-        )
-        lines = [
-            f"engine: {selection.engine} ({ENGINE_SOURCE_LABELS[selection.source]})",
-            f"model: {resolution.value or 'default'} ({OVERRIDE_SOURCE_LABELS[resolution.source]})",
-            "defaults: "
-            f"thread: {resolution.thread_value or 'none'}, "
-            f"room: {resolution.room_value or 'none'}",
-            f"available engines: {', '.join(cfg.runtime.engine_ids)}",
-        ]
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="\n\n".join(lines))
-        return
 
-    if action == "set":
-        parsed = _parse_override_set_args(tokens, engine_ids=engine_ids)
-        if parsed.value is None:
-            await _reply(cfg, room_id=room_id, event_id=event_id, text=MODEL_USAGE)
-            return
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for model overrides.",
-            failed_member="failed to verify model override permissions.",
-            denied="changing model overrides is restricted to room admins.",
-        ):
-            return
-        if parsed.engine is None:
-            selection = await _resolve_engine_selection(
-                cfg, msg, ambient_context=ambient_context
-            )
-            engine = selection.engine
-        else:
-            engine = parsed.engine
-        scope = await _apply_override_update(
-            cfg,
-            msg,
-            engine=engine,
-            update=lambda current: EngineOverrides(
-                model=parsed.value,
-                reasoning=current.reasoning if current is not None else None,
-            ),
-        )
-        if scope is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="override store unavailable.",
-            )
-            return
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"{scope} model override set to `{parsed.value}` for `{engine}`.\nIf you want a clean start, run `/new`.",
-        )
-        return
+def _validate_model(engine: str, value: str) -> tuple[str | None, str | None]:
+    return value, None
 
-    if action == "clear":
-        if len(tokens) > 2:
-            await _reply(cfg, room_id=room_id, event_id=event_id, text=MODEL_USAGE)
-            return
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for model overrides.",
-            failed_member="failed to verify model override permissions.",
-            denied="changing model overrides is restricted to room admins.",
-        ):
-            return
-        engine = tokens[1].strip().lower() if len(tokens) == 2 else None
-        if engine is None:
-            selection = await _resolve_engine_selection(
-                cfg, msg, ambient_context=ambient_context
-            )
-            engine = selection.engine
-        if engine not in engine_ids:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"unknown engine `{engine}`.\navailable: `{', '.join(cfg.runtime.engine_ids)}`",
-            )
-            return
-        scope = await _apply_override_update(
-            cfg,
-            msg,
-            engine=engine,
-            update=lambda current: EngineOverrides(
-                model=None,
-                reasoning=current.reasoning if current is not None else None,
-            ),
-        )
-        if scope is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="override store unavailable.",
-            )
-            return
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"{scope} model override cleared.",
+
+def _validate_reasoning(engine: str, value: str) -> tuple[str | None, str | None]:
+    if not supports_reasoning(engine):
+        return None, f"engine `{engine}` does not support reasoning overrides."
+    level = value.strip().lower()
+    allowed = allowed_reasoning_levels()
+    if level not in allowed:
+        return (
+            None,
+            f"unknown reasoning level `{value}`.\navailable: {', '.join(allowed)}",
         )
-        return
+    return level, None
+
+
+@dataclass(frozen=True, slots=True)
+class OverrideFieldSpec:
+    """Per-field behaviour shared by the /model and /reasoning commands."""
+
+    field: Literal["model", "reasoning"]
+    usage: str
+    show_template: str
+    available: Callable[[MatrixBridgeConfig], str]
+    validate: Callable[[str, str], tuple[str | None, str | None]]
+    updater: Callable[[str | None], Callable[[EngineOverrides | None], EngineOverrides]]
+
+
+MODEL_SPEC = OverrideFieldSpec(
+    field="model",
+    usage=MODEL_USAGE,
+    show_template=MODEL_SHOW_TEMPLATE,
+    available=lambda cfg: ", ".join(cfg.runtime.engine_ids),
+    validate=_validate_model,
+    updater=_SetModel,
+)
+REASONING_SPEC = OverrideFieldSpec(
+    field="reasoning",
+    usage=REASONING_USAGE,
+    show_template=REASONING_SHOW_TEMPLATE,
+    available=lambda cfg: _REASONING_LEVELS_TEXT,
+    validate=_validate_reasoning,
+    updater=_SetReasoning,
+)
+
 
-    await _reply(cfg, room_id=room_id, event_id=event_id, text=MODEL_USAGE)
+async def _require_override_admin(
+    rctx: ReplyCtx, msg: MatrixIncomingMessage, spec: OverrideFieldSpec
+) -> bool:
+    return await _require_admin_or_private(
+        rctx,
+        msg,
+        missing_sender=f"cannot verify sender for {spec.field} overrides.",
+        failed_member=f"failed to verify {spec.field} override permissions.",
+        denied=f"changing {spec.field} overrides is restricted to room admins.",
+    )
 
 
-async def _handle_reasoning_command(
+async def _override_show(
+    spec: OverrideFieldSpec,
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
-    args_text: str,
+    command: ParsedCommand,
     ambient_context: RunContext | None,
 ) -> None:
-    tokens = split_command_args(args_text)
-    action = tokens[0].lower() if tokens else "show"
-    room_id = msg.room_id
-    event_id = msg.event_id
-    engine_ids = {engine.lower() for engine in cfg.runtime.engine_ids}
+    rctx = ReplyCtx.for_message(cfg, msg)
+    selection = await _resolve_engine_selection(
+        cfg, msg, ambient_context=ambient_context
+    )
+    thread_override, room_override = await _read_overrides_for_engine(
+        cfg, msg, selection.engine
+    )
+    resolution = resolve_override_value(
+        thread_override=thread_override,
+        room_override=room_override,
+        field=spec.field,
+    )
+    text = spec.show_template.format(
+        engine=selection.engine,
+        engine_source=ENGINE_SOURCE_LABELS[selection.source],
+        value=resolution.value or "default",
+        source=OVERRIDE_SOURCE_LABELS[resolution.source],
+        thread=resolution.thread_value or "none",
+        room=resolution.room_value or "none",
+        available=spec.available(cfg),
+    )
+    await _reply(rctx, text)
 
-    if action in {"show", ""}:
+
+async def _override_set(
+    spec: OverrideFieldSpec,
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    parsed = _parse_override_set_args(
+        command.tokens, engine_ids=_engine_ids_lower(cfg.runtime)
+    )
+    if parsed.value is None:
+        await _reply(rctx, spec.usage)
+        return
+    if not await _require_override_admin(rctx, msg, spec):
+        return
+    if parsed.engine is None:
         selection = await _resolve_engine_selection(
             cfg, msg, ambient_context=ambient_context
         )
-        thread_override, room_override = await _read_overrides_for_engine(
-            cfg, msg, selection.engine
-        )
-        resolution = resolve_override_value(
-            thread_override=thread_override,
-            room_override=room_override,
-            field="reasoning",
-        )
-        lines = [
-            f"engine: {selection.engine} ({ENGINE_SOURCE_LABELS[selection.source]})",
-            "reasoning: "
-            f"{resolution.value or 'default'} ({OVERRIDE_SOURCE_LABELS[resolution.source]})",
-            "defaults: "
-            f"thread: {resolution.thread_value or 'none'}, "
-            f"room: {resolution.room_value or 'none'}",
-            f"available levels: {', '.join(allowed_reasoning_levels())}",
-        ]
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="\n\n".join(lines))
+        engine = selection.engine
+    else:
+        engine = parsed.engine
+    value, error = spec.validate(engine, parsed.value)
+    if error is not None:
+        await _reply(rctx, error)
         return
-
-    if action == "set":
-        parsed = _parse_override_set_args(tokens, engine_ids=engine_ids)
-        if parsed.value is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=REASONING_USAGE,
-            )
-            return
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for reasoning overrides.",
-            failed_member="failed to verify reasoning override permissions.",
-            denied="changing reasoning overrides is restricted to room admins.",
-        ):
-            return
-        if parsed.engine is None:
-            selection = await _resolve_engine_selection(
-                cfg, msg, ambient_context=ambient_context
-            )
-            engine = selection.engine
-        else:
-            engine = parsed.engine
-        if not supports_reasoning(engine):
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"engine `{engine}` does not support reasoning overrides.",
-            )
-            return
-        level = parsed.value.strip().lower()
-        allowed = allowed_reasoning_levels()
-        if level not in allowed:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"unknown reasoning level `{parsed.value}`.\navailable: {', '.join(allowed)}",
-            )
-            return
-        scope = await _apply_override_update(
-            cfg,
-            msg,
-            engine=engine,
-            update=lambda current: EngineOverrides(
-                model=current.model if current is not None else None,
-                reasoning=level,
-            ),
-        )
-        if scope is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="override store unavailable.",
-            )
-            return
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"{scope} reasoning override set to `{level}` for `{engine}`.\nIf you want a clean start, run `/new`.",
-        )
+    scope = await _apply_override_update(
+        cfg,
+        msg,
+        engine=engine,
+        update=spec.updater(value),
+    )
+    if scope is None:
+        await _reply(rctx, "override store unavailable.")
         return
+    await _reply(
+        rctx,
+        f"{scope} {spec.field} override set to `{value}` for `{engine}`.\nIf you want a clean start, run `/new`.",
+    )
 
-    if action == "clear":
-        if len(tokens) > 2:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=REASONING_USAGE,
-            )
-            return
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for reasoning overrides.",
-            failed_member="failed to verify reasoning override permissions.",
-            denied="changing reasoning overrides is restricted to room admins.",
-        ):
-            return
-        engine = tokens[1].strip().lower() if len(tokens) == 2 else None
-        if engine is None:
-            selection = await _resolve_engine_selection(
-                cfg, msg, ambient_context=ambient_context
-            )
-            engine = selection.engine
-        if engine not in engine_ids:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"unknown engine `{engine}`.\navailable: `{', '.join(cfg.runtime.engine_ids)}`",
-            )
-            return
-        scope = await _apply_override_update(
-            cfg,
-            msg,
-            engine=engine,
-            update=lambda current: EngineOverrides(
-                model=current.model if current is not None else None,
-                reasoning=None,
-            ),
+
+async def _override_clear(
+    spec: OverrideFieldSpec,
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    tokens = command.tokens
+    if len(tokens) > 2:
+        await _reply(rctx, spec.usage)
+        return
+    if not await _require_override_admin(rctx, msg, spec):
+        return
+    engine = tokens[1].strip().lower() if len(tokens) == 2 else None
+    if engine is None:
+        selection = await _resolve_engine_selection(
+            cfg, msg, ambient_context=ambient_context
         )
-        if scope is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="override store unavailable.",
-            )
-            return
+        engine = selection.engine
+    if engine not in _engine_ids_lower(cfg.runtime):
         await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"{scope} reasoning override cleared.",
+            rctx,
+            f"unknown engine `{engine}`.\navailable: `{', '.join(cfg.runtime.engine_ids)}`",
         )
         return
+    scope = await _apply_override_update(
+        cfg,
+        msg,
+        engine=engine,
+        update=spec.updater(None),
+    )
+    if scope is None:
+        await _reply(rctx, "override store unavailable.")
+        return
+    await _reply(rctx, f"{scope} {spec.field} override cleared.")
+
 
-    await _reply(cfg, room_id=room_id, event_id=event_id, text=REASONING_USAGE)
+def _override_actions(spec: OverrideFieldSpec) -> dict[str, _ActionHandler]:
+    show = partial(_override_show, spec)
+    return {
+        "show": show,
+        "": show,
+        "set": partial(_override_set, spec),
+        "clear": partial(_override_clear, spec),
+    }
 
 
-async def _handle_trigger_command(
+_OVERRIDE_SPECS: dict[str, OverrideFieldSpec] = {
+    spec.field: spec for spec in (MODEL_SPEC, REASONING_SPEC)
+}
+_OVERRIDE_ACTIONS: dict[str, dict[str, _ActionHandler]] = {
+    field: _override_actions(spec) for field, spec in _OVERRIDE_SPECS.items()
+}
+
+
+async def _handle_override_command(
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
-    args_text: str,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+    spec: OverrideFieldSpec,
 ) -> None:
-    tokens = split_command_args(args_text)
-    action = tokens[0].lower() if tokens else "show"
+    await _dispatch_action(
+        _OVERRIDE_ACTIONS[spec.field],
+        cfg,
+        msg,
+        command,
+        ambient_context,
+        unknown_text=spec.usage,
+    )
+
+
+async def _trigger_show(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
     room_id = msg.room_id
-    event_id = msg.event_id
     thread_root = _thread_scope(msg, cfg)
+    resolved = await resolve_trigger_mode(
+        room_id=room_id,
+        room_prefs=cfg.room_prefs,
+        thread_root_event_id=msg.thread_root_event_id,
+        thread_state=cfg.thread_state,
+    )
+    thread_mode = (
+        await cfg.thread_state.get_trigger_mode(room_id, thread_root)
+        if thread_root is not None
+        else None
+    )
+    room_mode = (
+        await cfg.room_prefs.get_trigger_mode(room_id)
+        if cfg.room_prefs is not None
+        else None
+    )
+    source = (
+        "thread override"
+        if thread_mode is not None
+        else "room default"
+        if room_mode is not None
+        else "default"
+    )
+    text = TRIGGER_SHOW_TEMPLATE.format(
+        mode=resolved,
+        source=source,
+        thread=thread_mode or "none",
+        room=room_mode or "none",
+    )
+    await _reply(rctx, text)
 
-    if action in {"show", ""}:
-        resolved = await resolve_trigger_mode(
-            room_id=room_id,
-            room_prefs=cfg.room_prefs,
-            thread_root_event_id=msg.thread_root_event_id,
-            thread_state=cfg.thread_state,
-        )
-        thread_mode = (
-            await cfg.thread_state.get_trigger_mode(room_id, thread_root)
-            if thread_root is not None
-            else None
-        )
-        room_mode = (
-            await cfg.room_prefs.get_trigger_mode(room_id)
-            if cfg.room_prefs is not None
-            else None
-        )
-        source = (
-            "thread override"
-            if thread_mode is not None
-            else "room default"
-            if room_mode is not None
-            else "default"
-        )
-        lines = [
-            f"trigger: {resolved} ({source})",
-            f"defaults: thread: {thread_mode or 'none'}, room: {room_mode or 'none'}",
-            "available: all, mentions",
-        ]
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="\n\n".join(lines))
-        return
 
-    if action in {"all", "mentions"}:
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for trigger settings.",
-            failed_member="failed to verify trigger permissions.",
-            denied="changing trigger mode is restricted to room admins.",
-        ):
-            return
-        if thread_root is not None:
-            mode = action if action == "mentions" else None
-            await cfg.thread_state.set_trigger_mode(room_id, thread_root, mode)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"thread trigger mode set to `{action}`",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room trigger settings unavailable.",
-            )
-            return
-        mode = action if action == "mentions" else None
-        await cfg.room_prefs.set_trigger_mode(room_id, mode)
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"room trigger mode set to `{action}`",
-        )
+async def _trigger_set_mode(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    room_id = msg.room_id
+    action = command.action
+    if not await _require_admin_or_private(
+        rctx,
+        msg,
+        missing_sender="cannot verify sender for trigger settings.",
+        failed_member="failed to verify trigger permissions.",
+        denied="changing trigger mode is restricted to room admins.",
+    ):
+        return
+    mode = action if action == "mentions" else None
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.set_trigger_mode(room_id, thread_root, mode)
+        await _reply(rctx, f"thread trigger mode set to `{action}`")
+        return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room trigger settings unavailable.")
         return
+    await cfg.room_prefs.set_trigger_mode(room_id, mode)
+    await _reply(rctx, f"room trigger mode set to `{action}`")
 
-    if action == "clear":
-        if not await _require_admin_or_private(
-            cfg,
-            msg,
-            missing_sender="cannot verify sender for trigger settings.",
-            failed_member="failed to verify trigger permissions.",
-            denied="changing trigger mode is restricted to room admins.",
-        ):
-            return
-        if thread_root is not None:
-            await cfg.thread_state.clear_trigger_mode(room_id, thread_root)
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="thread trigger mode cleared (using room default).",
-            )
-            return
-        if cfg.room_prefs is None:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="room trigger settings unavailable.",
-            )
-            return
-        await cfg.room_prefs.clear_trigger_mode(room_id)
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="room trigger mode reset to `all`.",
-        )
+
+async def _trigger_clear(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+    ambient_context: RunContext | None,
+) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
+    room_id = msg.room_id
+    if not await _require_admin_or_private(
+        rctx,
+        msg,
+        missing_sender="cannot verify sender for trigger settings.",
+        failed_member="failed to verify trigger permissions.",
+        denied="changing trigger mode is restricted to room admins.",
+    ):
+        return
+    thread_root = _thread_scope(msg, cfg)
+    if thread_root is not None:
+        await cfg.thread_state.clear_trigger_mode(room_id, thread_root)
+        await _reply(rctx, "thread trigger mode cleared (using room default).")
         return
+    if cfg.room_prefs is None:
+        await _reply(rctx, "room trigger settings unavailable.")
+        return
+    await cfg.room_prefs.clear_trigger_mode(room_id)
+    await _reply(rctx, "room trigger mode reset to `all`.")
+
+
+_TRIGGER_ACTIONS: dict[str, _ActionHandler] = {
+    "show": _trigger_show,
+    "": _trigger_show,
+    "all": _trigger_set_mode,
+    "mentions": _trigger_set_mode,
+    "clear": _trigger_clear,
+}
+
 
-    await _reply(cfg, room_id=room_id, event_id=event_id, text=TRIGGER_USAGE)
+async def _handle_trigger_command(
+    cfg: MatrixBridgeConfig,
+    msg: MatrixIncomingMessage,
+    command: ParsedCommand,
+) -> None:
+    await _dispatch_action(
+        _TRIGGER_ACTIONS,
+        cfg,
+        msg,
+        command,
+        None,
+        unknown_text=TRIGGER_USAGE,
+    )
 
 
 def _file_limits(cfg: MatrixBridgeConfig) -> int:
@@ -1002,6 +1002,16 @@ def _file_limits(cfg: MatrixBridgeConfig) -> int:
     return max(1, cfg.file_download.max_size_bytes)
 
 
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+    except NotADirectoryError:
+        # A parent component is a file, so the target cannot exist either.
+        return None
+
+
 def _resolve_file_put_paths(
     *,
     path_value: str | None,
@@ -1027,7 +1037,8 @@ async def _resolve_file_context(
     ambient_context: RunContext | None,
 ) -> tuple[RunContext | None, Path | None, str | None]:
     try:
-        resolved = cfg.runtime.resolve_message(
+        resolved = await _resolve_message(
+            cfg,
             text=args_text,
             reply_text=msg.reply_to_text,
             ambient_context=ambient_context,
@@ -1046,16 +1057,100 @@ async def _resolve_file_context(
     return context, run_root, None
 
 
+def _check_put_target(
+    run_root: Path, target_rel: Path, force: bool
+) -> tuple[Path | None, str | None]:
+    """Run the blocking checks for a ``/file put`` target in one pass.
+
+    Returns ``(target, None)`` when the write may proceed, otherwise
+    ``(None, reason)``. Meant to be called via ``anyio.to_thread``.
+    """
+    deny = deny_reason(target_rel, FILE_DEFAULT_DENY_GLOBS)
+    if deny is not None:
+        return None, f"path denied by rule: {deny}"
+    target = resolve_path_within_root(run_root, target_rel)
+    if target is None:
+        return None, "path escapes repo root"
+    try:
+        target_stat = _stat_or_none(target)
+    except OSError as exc:
+        return None, f"failed to write: {exc}"
+    if target_stat is not None:
+        if stat.S_ISDIR(target_stat.st_mode):
+            return None, "target is directory"
+        if not force:
+            return None, "file exists; use --force to overwrite"
+    return target, None
+
+
+def _check_get_target(
+    run_root: Path, rel_path: Path
+) -> tuple[Path | None, os.stat_result | None, str | None]:
+    """Resolve and stat a ``/file get`` target in one pass.
+
+    Returns ``(target, stat, None)`` on success, otherwise an error reply.
+    Meant to be called via ``anyio.to_thread``.
+    """
+    target = resolve_path_within_root(run_root, rel_path)
+    if target is None:
+        return None, None, "download path escapes repo root."
+    try:
+        target_stat = _stat_or_none(target)
+    except OSError as exc:
+        return None, None, f"failed to read file: {exc}"
+    if target_stat is None:
+        return None, None, "file does not exist."
+    return target, target_stat, None
+
+
+async def _pipeline_attachments(
+    cfg: MatrixBridgeConfig,
+    attachments: Sequence[MatrixFile],
+    max_bytes: int,
+    handle: Callable[[MatrixFile, bytes | None], Awaitable[None]],
+) -> None:
+    """Download attachments concurrently and hand them to ``handle`` in order.
+
+    At most ``FILE_PUT_MAX_IN_FLIGHT`` payloads are downloading or waiting to
+    be handled at once, so writes overlap downloads without unbounded memory.
+    """
+    payloads: list[bytes | None] = [None] * len(attachments)
+    downloaded = [anyio.Event() for _ in attachments]
+    slots = anyio.Semaphore(FILE_PUT_MAX_IN_FLIGHT)
+
+    async def download(idx: int, attachment: MatrixFile) -> None:
+        payloads[idx] = await cfg.client.download_file(
+            attachment.mxc_url,
+            max_size=max_bytes,
+            file_info=attachment.file_info,
+        )
+        downloaded[idx].set()
+
+    async def produce(tg: anyio.abc.TaskGroup) -> None:
+        for idx, attachment in enumerate(attachments):
+            await slots.acquire()
+            tg.start_soon(download, idx, attachment)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(produce, tg)
+        for idx, attachment in enumerate(attachments):
+            await downloaded[idx].wait()
+            payload, payloads[idx] = payloads[idx], None
+            try:
+                await handle(attachment, payload)
+            finally:
+                slots.release()
+
+
 async def _handle_file_put_command(
     cfg: MatrixBridgeConfig,
     msg: MatrixIncomingMessage,
     args_text: str,
     ambient_context: RunContext | None,
 ) -> None:
-    room_id = msg.room_id
-    event_id = msg.event_id
+    rctx = ReplyCtx.for_message(cfg, msg)
     if not await _require_admin_or_private(
-        cfg,
+        rctx,
         msg,
         missing_sender="cannot verify sender for file transfer.",
         failed_member="failed to verify file transfer permissions.",
@@ -1063,7 +1158,7 @@ async def _handle_file_put_command(
     ):
         return
     if not msg.attachments:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=FILE_PUT_USAGE)
+        await _reply(rctx, FILE_PUT_USAGE)
         return
 
     context, run_root, error = await _resolve_file_context(
@@ -1073,12 +1168,12 @@ async def _handle_file_put_command(
         ambient_context,
     )
     if error is not None or run_root is None or context is None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=error or "error")
+        await _reply(rctx, error or "error")
         return
 
     prompt_value, force, parse_error = parse_file_prompt(args_text, allow_empty=True)
     if parse_error is not None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=parse_error)
+        await _reply(rctx, parse_error)
         return
 
     base_dir, rel_path, path_error = _resolve_file_put_paths(
@@ -1086,60 +1181,42 @@ async def _handle_file_put_command(
         require_dir=len(msg.attachments) > 1,
     )
     if path_error is not None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=path_error)
+        await _reply(rctx, path_error)
         return
 
     max_bytes = _file_limits(cfg)
     saved: list[tuple[str, int]] = []
     failed: list[str] = []
-    for attachment in msg.attachments:
-        payload = await cfg.client.download_file(
-            attachment.mxc_url,
-            max_size=max_bytes,
-            file_info=attachment.file_info,
-        )
+
+    async def store(attachment: MatrixFile, payload: bytes | None) -> None:
         if payload is None:
             failed.append(f"`{attachment.filename}` (failed to download)")
-            continue
+            return
         if len(payload) > max_bytes:
             failed.append(f"`{attachment.filename}` (file is too large)")
-            continue
+            return
         if rel_path is not None:
             target_rel = rel_path
         elif base_dir is not None:
             target_rel = base_dir / attachment.filename
         else:
             target_rel = Path(FILE_DEFAULT_UPLOADS_DIR) / attachment.filename
-        deny = deny_reason(target_rel, FILE_DEFAULT_DENY_GLOBS)
-        if deny is not None:
-            failed.append(f"`{attachment.filename}` (path denied by rule: {deny})")
-            continue
-        target = resolve_path_within_root(run_root, target_rel)
+        target, reason = await anyio.to_thread.run_sync(
+            _check_put_target, run_root, target_rel, force
+        )
         if target is None:
-            failed.append(f"`{attachment.filename}` (path escapes repo root)")
-            continue
-        if target.exists():
-            if target.is_dir():
-                failed.append(f"`{attachment.filename}` (target is directory)")
-                continue
-            if not force:
-                failed.append(
-                    f"`{attachment.filename}` (file exists; use --force to overwrite)"
-                )
-                continue
+            failed.append(f"`{attachment.filename}` ({reason})")
+            return
         try:
-            write_bytes_atomic(target, payload)
+            await anyio.to_thread.run_sync(write_bytes_atomic, target, payload)
             saved.append((target_rel.as_posix(), len(payload)))
         except OSError as exc:
             failed.append(f"`{attachment.filename}` (failed to write: {exc})")
 
+    await _pipeline_attachments(cfg, msg.attachments, max_bytes, store)
+
     if not saved and failed:
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"failed: {', '.join(failed)}",
-        )
+        await _reply(rctx, f"failed: {', '.join(failed)}")
         return
     details = ", ".join(f"`{path}` ({format_bytes(size)})" for path, size in saved)
     text = (
@@ -1149,7 +1226,7 @@ async def _handle_file_put_command(
     )
     if failed:
         text = f"{text}\n\nfailed: {', '.join(failed)}"
-    await _reply(cfg, room_id=room_id, event_id=event_id, text=text)
+    await _reply(rctx, text)
 
 
 async def _handle_file_get_command(
@@ -1158,10 +1235,11 @@ async def _handle_file_get_command(
     args_text: str,
     ambient_context: RunContext | None,
 ) -> None:
+    rctx = ReplyCtx.for_message(cfg, msg)
     room_id = msg.room_id
     event_id = msg.event_id
     if not await _require_admin_or_private(
-        cfg,
+        rctx,
         msg,
         missing_sender="cannot verify sender for file transfer.",
         failed_member="failed to verify file transfer permissions.",
@@ -1175,88 +1253,57 @@ async def _handle_file_get_command(
         ambient_context,
     )
     if error is not None or run_root is None or context is None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=error or "error")
+        await _reply(rctx, error or "error")
         return
 
     path_value, _, parse_error = parse_file_prompt(args_text, allow_empty=False)
     if parse_error is not None or path_value is None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text=FILE_GET_USAGE)
+        await _reply(rctx, FILE_GET_USAGE)
         return
     rel_path = normalize_relative_path(path_value)
     if rel_path is None:
-        await _reply(cfg, room_id=room_id, event_id=event_id, text="invalid path.")
+        await _reply(rctx, "invalid path.")
         return
     deny = deny_reason(rel_path, FILE_DEFAULT_DENY_GLOBS)
     if deny is not None:
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text=f"path denied by rule: {deny}",
-        )
+        await _reply(rctx, f"path denied by rule: {deny}")
         return
 
-    target = resolve_path_within_root(run_root, rel_path)
-    if target is None:
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="download path escapes repo root.",
-        )
-        return
-    if not target.exists():
-        await _reply(
-            cfg, room_id=room_id, event_id=event_id, text="file does not exist."
-        )
+    target, target_stat, error = await anyio.to_thread.run_sync(
+        _check_get_target, run_root, rel_path
+    )
+    if target is None or target_stat is None:
+        await _reply(rctx, error or "file does not exist.")
         return
 
     max_bytes = _file_limits(cfg)
-    if target.is_dir():
+    if stat.S_ISDIR(target_stat.st_mode):
         try:
-            payload = zip_directory(
-                run_root,
-                rel_path,
-                FILE_DEFAULT_DENY_GLOBS,
-                max_bytes=max_bytes,
+            payload = await anyio.to_thread.run_sync(
+                partial(
+                    zip_directory,
+                    run_root,
+                    rel_path,
+                    FILE_DEFAULT_DENY_GLOBS,
+                    max_bytes=max_bytes,
+                )
             )
         except ZipTooLargeError:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text="file is too large to send.",
-            )
+            await _reply(rctx, "file is too large to send.")
             return
         except OSError as exc:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"failed to read directory: {exc}",
-            )
+            await _reply(rctx, f"failed to read directory: {exc}")
             return
         filename = f"{rel_path.name or 'archive'}.zip"
         mimetype = "application/zip"
     else:
+        if target_stat.st_size > max_bytes:
+            await _reply(rctx, "file is too large to send.")
+            return
         try:
-            size = target.stat().st_size
-            if size > max_bytes:
-                await _reply(
-                    cfg,
-                    room_id=room_id,
-                    event_id=event_id,
-                    text="file is too large to send.",
-                )
-                return
-            payload = target.read_bytes()
+            payload = await anyio.to_thread.run_sync(target.read_bytes)
         except OSError as exc:
-            await _reply(
-                cfg,
-                room_id=room_id,
-                event_id=event_id,
-                text=f"failed to read file: {exc}",
-            )
+            await _reply(rctx, f"failed to read file: {exc}")
             return
         filename = target.name
         mimetype = None
@@ -1270,12 +1317,7 @@ async def _handle_file_get_command(
         encrypt=True,
     )
     if sent is None:
-        await _reply(
-            cfg,
-            room_id=room_id,
-            event_id=event_id,
-            text="failed to send file.",
-        )
+        await _reply(rctx, "failed to send file.")
 
 
 async def handle_builtin_command(
@@ -1288,27 +1330,32 @@ async def handle_builtin_command(
 ) -> bool:
     """Handle built-in Matrix transport commands."""
     if command_id == "ctx":
-        await _handle_ctx_command(cfg, msg, args_text, ambient_context)
+        await _handle_ctx_command(cfg, msg, _parse_command(args_text), ambient_context)
         return True
     if command_id == "new":
         await _handle_new_command(cfg, msg)
         return True
     if command_id == "agent":
-        await _handle_agent_command(cfg, msg, args_text, ambient_context)
-        return True
-    if command_id == "model":
-        await _handle_model_command(cfg, msg, args_text, ambient_context)
+        await _handle_agent_command(
+            cfg, msg, _parse_command(args_text), ambient_context
+        )
         return True
-    if command_id == "reasoning":
-        await _handle_reasoning_command(cfg, msg, args_text, ambient_context)
+    if command_id in _OVERRIDE_SPECS:
+        await _handle_override_command(
+            cfg,
+            msg,
+            _parse_command(args_text),
+            ambient_context,
+            _OVERRIDE_SPECS[command_id],
+        )
         return True
     if command_id == "trigger":
-        await _handle_trigger_command(cfg, msg, args_text)
+        await _handle_trigger_command(cfg, msg, _parse_command(args_text))
         return True
     if command_id == "file":
         subcommand, rest, error = parse_file_command(args_text)
         if error is not None:
-            await _reply(cfg, room_id=msg.room_id, event_id=msg.event_id, text=error)
+            await _reply(ReplyCtx.for_message(cfg, msg), error)
             return True
         if subcommand == "put":
             await _handle_file_put_command(cfg, msg, rest, ambient_context)
@@ -1318,8 +1365,9 @@ async def handle_builtin_command(
             return True
         return True
     if command_id == "reload":
+        rctx = ReplyCtx.for_message(cfg, msg)
         if not await _require_admin_or_private(
-            cfg,
+            rctx,
             msg,
             missing_sender="cannot verify sender for reload command.",
             failed_member="failed to verify reload permissions.",
@@ -1327,12 +1375,7 @@ async def handle_builtin_command(
             allow_private=False,
         ):
             return True
-        await _reply(
-            cfg,
-            room_id=msg.room_id,
-            event_id=msg.event_id,
-            text="reload requested. restarting takopi process now.",
-        )
+        await _reply(rctx, "reload requested. restarting takopi process now.")
         _request_process_restart()
         return True
     return False
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import re
 import shlex
 
+_SHLEX_WHITESPACE = " \t\r\n"
+_SHLEX_WHITESPACE_RE = re.compile(r"[ \t\r\n]+")
+_SHLEX_SPECIAL_RE = re.compile(r"[\"'\\]")
+
 
 def normalize_slash_prefix(text: str) -> str:
     """Normalize slash-prefixed text.
@@ -11,6 +16,10 @@ def normalize_slash_prefix(text: str) -> str:
     Matrix clients often require `//cmd` so the sent text is `/cmd`.
     Accept both forms by collapsing only the first leading slash.
     """
+    if text.startswith("//"):
+        return text[1:]
+    if not text or not text[0].isspace():
+        return text
     stripped = text.lstrip()
     if not stripped.startswith("//"):
         return text
@@ -28,6 +37,9 @@ def parse_slash_command(text: str) -> tuple[str | None, str]:
         A tuple of (command_id, args_text) where command_id is None if
         the text is not a slash command.
     """
+    if not text or (text[0] != "/" and not text[0].isspace()):
+        # Plain chat messages: skip normalization and line splitting.
+        return None, text
     stripped = normalize_slash_prefix(text).lstrip()
     if not stripped.startswith("/"):
         return None, text
@@ -40,7 +52,7 @@ def parse_slash_command(text: str) -> tuple[str | None, str]:
     if not command:
         return None, text
     if "@" in command:
-        command = command.split("@", 1)[0]
+        command = command.partition("@")[0]
     args_text = rest
     if len(lines) > 1:
         tail = "\n".join(lines[1:])
@@ -57,8 +69,11 @@ def split_command_args(text: str) -> tuple[str, ...]:
     Returns:
         A tuple of argument strings.
     """
-    if not text.strip():
+    if not text or text.isspace():
         return ()
+    if not _SHLEX_SPECIAL_RE.search(text):
+        # Without quotes or escapes shlex only splits on its whitespace set.
+        return tuple(_SHLEX_WHITESPACE_RE.split(text.strip(_SHLEX_WHITESPACE)))
     try:
         return tuple(shlex.split(text))
     except ValueError:
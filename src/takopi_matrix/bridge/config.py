@@ -47,7 +47,7 @@ class MatrixBridgeConfig:
 
     client: MatrixClient
     runtime: TransportRuntime
-    room_ids: list[str]
+    room_ids: tuple[str, ...]
     user_allowlist: set[str] | None
     startup_msg: str
     exec_cfg: ExecBridgeConfig
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import tomllib
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from pathlib import Path
@@ -245,6 +246,16 @@ async def _persist_new_rooms(room_ids: list[str], config_path: object) -> None:
     try:
         # Read current config
         config_text = config_path.read_text()
+        # tomllib is far cheaper than tomlkit's style-preserving parser, so use
+        # it to skip the full parse when every room is already listed.
+        listed = (
+            tomllib.loads(config_text)
+            .get("transports", {})
+            .get("matrix", {})
+            .get("room_ids", [])
+        )
+        if all(room_id in listed for room_id in room_ids):
+            return
         config = tomlkit.parse(config_text)
 
         # Get current room_ids
@@ -272,8 +283,13 @@ async def _persist_new_rooms(room_ids: list[str], config_path: object) -> None:
 
         # Write back atomically
         temp_path = config_path.with_suffix(".toml.tmp")
-        temp_path.write_text(tomlkit.dumps(config))
-        temp_path.rename(config_path)
+        try:
+            temp_path.write_text(tomlkit.dumps(config))
+            # replace() overwrites atomically on every platform, unlike rename()
+            temp_path.replace(config_path)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
 
         logger.info(
             "matrix.config.rooms_updated",
@@ -300,14 +316,20 @@ async def _send_startup(cfg: MatrixBridgeConfig) -> None:
     text, formatted_body = prepare_matrix(parts)
     message = RenderedMessage(text=text, extra={"formatted_body": formatted_body})
 
-    for room_id in cfg.room_ids:
-        sent = await cfg.exec_cfg.transport.send(
+    transport = cfg.exec_cfg.transport
+
+    async def send_to(room_id: str) -> None:
+        sent = await transport.send(
             channel_id=room_id,
             message=message,
         )
         if sent is not None:
             logger.info("startup.sent", room_id=room_id)
 
+    async with anyio.create_task_group() as tg:
+        for room_id in cfg.room_ids:
+            tg.start_soon(send_to, room_id)
+
 
 async def _sync_loop(
     cfg: MatrixBridgeConfig,
@@ -379,12 +401,15 @@ async def _initialize_e2ee_if_available(cfg: MatrixBridgeConfig) -> None:
 
 async def _trust_room_devices_if_e2ee(cfg: MatrixBridgeConfig) -> None:
     """Trust devices and establish encryption sessions in all configured rooms."""
-    if not cfg.client.e2ee_available:
+    client = cfg.client
+    if not client.e2ee_available:
         return
 
+    # Rooms are prepared one at a time: rooms that share users would otherwise
+    # race on the single nio client and claim the same one-time keys twice.
     for room_id in cfg.room_ids:
-        await cfg.client.trust_room_devices(room_id)
-        await cfg.client.ensure_room_keys(room_id)
+        await client.trust_room_devices(room_id)
+        await client.ensure_room_keys(room_id)
 
 
 async def _startup_sequence(cfg: MatrixBridgeConfig) -> bool:
@@ -412,13 +437,15 @@ async def _startup_sequence(cfg: MatrixBridgeConfig) -> bool:
     # Trust devices and establish encryption sessions (after sync so rooms are known)
     await _trust_room_devices_if_e2ee(cfg)
 
-    for room_id in cfg.room_ids:
-        await cfg.client.send_typing(room_id, typing=True)
+    client = cfg.client
+    room_ids = cfg.room_ids
+    for room_id in room_ids:
+        await client.send_typing(room_id, typing=True)
 
     await _send_startup(cfg)
 
-    for room_id in cfg.room_ids:
-        await cfg.client.send_typing(room_id, typing=False)
+    for room_id in room_ids:
+        await client.send_typing(room_id, typing=False)
 
     return True
 
@@ -436,6 +463,16 @@ async def _sync_chat_sessions_cwd_if_enabled(cfg: MatrixBridgeConfig) -> None:
         )
 
 
+async def _resolve_own_display_name(cfg: MatrixBridgeConfig) -> str | None:
+    """Fetch display name once at startup (cached for mention detection)."""
+    own_display_name = await cfg.client.get_display_name()
+    if own_display_name:
+        logger.debug("matrix.display_name.resolved", display_name=own_display_name)
+    else:
+        logger.warning("matrix.display_name.not_available")
+    return own_display_name
+
+
 async def run_main_loop(
     cfg: MatrixBridgeConfig,
     *,
@@ -450,14 +487,11 @@ async def run_main_loop(
         if not await _startup_sequence(cfg):
             return
 
-        await _sync_chat_sessions_cwd_if_enabled(cfg)
-
-        # Fetch display name once at startup (cached for mention detection)
-        own_display_name = await cfg.client.get_display_name()
-        if own_display_name:
-            logger.debug("matrix.display_name.resolved", display_name=own_display_name)
-        else:
-            logger.warning("matrix.display_name.not_available")
+        # The cwd check is local disk I/O and the display name is a profile
+        # request, so neither needs to wait for the other.
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_sync_chat_sessions_cwd_if_enabled, cfg)
+            own_display_name = await _resolve_own_display_name(cfg)
 
         allowlist = cfg.runtime.allowlist
         command_ids = {
@@ -89,7 +89,7 @@ class MatrixChatSessionStore(JsonStateStore[_ChatSessionsState]):
                 cleared = True
             if previous != normalized:
                 self._state.cwd = normalized
-                self._save_locked()
+                await self._save_locked()
             return cleared
 
     async def set_session_resume(
@@ -110,7 +110,7 @@ class MatrixChatSessionStore(JsonStateStore[_ChatSessionsState]):
                 sender_sessions = {}
                 room[sender_key] = sender_sessions
             sender_sessions[engine_key] = resume_value
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_sessions(self, room_id: str, sender: str) -> None:
         sender_key = _normalize_text(sender)
@@ -124,7 +124,7 @@ class MatrixChatSessionStore(JsonStateStore[_ChatSessionsState]):
             room.pop(sender_key, None)
             if not room:
                 self._state.rooms.pop(room_id, None)
-            self._save_locked()
+            await self._save_locked()
 
     def _ensure_room_locked(self, room_id: str) -> dict[str, dict[str, str]]:
         room = self._state.rooms.get(room_id)
@@ -5,22 +5,26 @@ from __future__ import annotations
 from typing import Any
 
 
+def _build_text_content(body: str, formatted_body: str | None) -> dict[str, Any]:
+    """Build plain m.text content, with HTML when a formatted body is given."""
+    if formatted_body:
+        return {
+            "msgtype": "m.text",
+            "body": body,
+            "format": "org.matrix.custom.html",
+            "formatted_body": formatted_body,
+        }
+    return {"msgtype": "m.text", "body": body}
+
+
 def _build_reply_content(
     body: str,
     formatted_body: str | None,
     reply_to_event_id: str,
 ) -> dict[str, Any]:
     """Build content with m.relates_to for replies."""
-    content: dict[str, Any] = {
-        "msgtype": "m.text",
-        "body": body,
-        "m.relates_to": {
-            "m.in_reply_to": {"event_id": reply_to_event_id},
-        },
-    }
-    if formatted_body:
-        content["format"] = "org.matrix.custom.html"
-        content["formatted_body"] = formatted_body
+    content = _build_text_content(body, formatted_body)
+    content["m.relates_to"] = {"m.in_reply_to": {"event_id": reply_to_event_id}}
     return content
 
 
@@ -30,18 +34,10 @@ def _build_edit_content(
     original_event_id: str,
 ) -> dict[str, Any]:
     """Build content with m.relates_to for edits (m.replace)."""
-    new_content: dict[str, Any] = {
-        "msgtype": "m.text",
-        "body": body,
-    }
-    if formatted_body:
-        new_content["format"] = "org.matrix.custom.html"
-        new_content["formatted_body"] = formatted_body
-
     return {
         "msgtype": "m.text",
         "body": f"* {body}",
-        "m.new_content": new_content,
+        "m.new_content": _build_text_content(body, formatted_body),
         "m.relates_to": {
             "rel_type": "m.replace",
             "event_id": original_event_id,
@@ -74,9 +70,7 @@ def _build_file_content(
         "info": info,
     }
     if file_info is not None:
-        encrypted = dict(file_info)
-        encrypted["url"] = mxc_url
-        content["file"] = encrypted
+        content["file"] = {**file_info, "url": mxc_url}
     else:
         content["url"] = mxc_url
 
@@ -9,6 +9,7 @@ Implements hierarchical engine selection:
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Literal
 
@@ -149,7 +150,7 @@ async def resolve_engine_for_message(
 
 
 def build_allowed_room_ids(
-    configured_room_ids: list[str],
+    configured_room_ids: Iterable[str],
     runtime: TransportRuntime,
     room_project_map: RoomProjectMap | None = None,
 ) -> set[str]:
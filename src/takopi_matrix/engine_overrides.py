@@ -41,15 +41,25 @@ def normalize_override_value(value: str | None) -> str | None:
     return cleaned or None
 
 
+def overrides_from_values(
+    model: str | None, reasoning: str | None
+) -> EngineOverrides | None:
+    """Build a normalized EngineOverrides from raw field values.
+
+    Returns None if both fields are empty after normalization.
+    """
+    model = normalize_override_value(model)
+    reasoning = normalize_override_value(reasoning)
+    if model is None and reasoning is None:
+        return None
+    return EngineOverrides(model=model, reasoning=reasoning)
+
+
 def normalize_overrides(overrides: EngineOverrides | None) -> EngineOverrides | None:
     """Normalize an EngineOverrides, returning None if all fields are empty."""
     if overrides is None:
         return None
-    model = normalize_override_value(overrides.model)
-    reasoning = normalize_override_value(overrides.reasoning)
-    if model is None and reasoning is None:
-        return None
-    return EngineOverrides(model=model, reasoning=reasoning)
+    return overrides_from_values(overrides.model, overrides.reasoning)
 
 
 def merge_overrides(
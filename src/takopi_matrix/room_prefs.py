@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from takopi.api import RunContext, get_logger
 
-from .engine_overrides import EngineOverrides, normalize_overrides
+from .engine_overrides import (
+    EngineOverrides,
+    normalize_overrides,
+    overrides_from_values,
+)
 from .state_store import JsonStateStore
 
 logger = get_logger(__name__)
@@ -177,12 +182,12 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
                 room["context_branch"] = None
                 if self._room_is_empty(room):
                     self._remove_room_locked(room_id)
-                self._save_locked()
+                await self._save_locked()
                 return
             room = self._ensure_room_locked(room_id)
             room["context_project"] = project
             room["context_branch"] = branch
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_context(self, room_id: str) -> None:
         """Clear room-bound context."""
@@ -211,11 +216,11 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
                 room["default_engine"] = None
                 if self._room_is_empty(room):
                     self._remove_room_locked(room_id)
-                self._save_locked()
+                await self._save_locked()
                 return
             room = self._ensure_room_locked(room_id)
             room["default_engine"] = normalized
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_default_engine(self, room_id: str) -> None:
         """Clear the default engine for a room."""
@@ -249,11 +254,11 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
                 room["trigger_mode"] = None
                 if self._room_is_empty(room):
                     self._remove_room_locked(room_id)
-                self._save_locked()
+                await self._save_locked()
                 return
             room = self._ensure_room_locked(room_id)
             room["trigger_mode"] = normalized
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_trigger_mode(self, room_id: str) -> None:
         """Clear the trigger mode for a room (resets to 'all')."""
@@ -278,40 +283,7 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._get_room_locked(room_id)
-            if room is None:
-                return None
-            overrides_dict = room.get("engine_overrides", {})
-            if not isinstance(overrides_dict, dict):
-                return None
-            override_data = overrides_dict.get(engine_key)
-            if override_data is None or not isinstance(override_data, dict):
-                return None
-
-            # Type-safe extraction with validation
-            model = override_data.get("model")
-            reasoning = override_data.get("reasoning")
-
-            # Validate types - JSON could contain unexpected types
-            if model is not None and not isinstance(model, str):
-                logger.warning(
-                    "matrix.room_prefs.invalid_model_type",
-                    room_id=room_id,
-                    engine=engine_key,
-                    value_type=type(model).__name__,
-                )
-                model = None
-            if reasoning is not None and not isinstance(reasoning, str):
-                logger.warning(
-                    "matrix.room_prefs.invalid_reasoning_type",
-                    room_id=room_id,
-                    engine=engine_key,
-                    value_type=type(reasoning).__name__,
-                )
-                reasoning = None
-
-            override = EngineOverrides(model=model, reasoning=reasoning)
-            return normalize_overrides(override)
+            return self._get_engine_override_locked(room_id, engine_key)
 
     async def set_engine_override(
         self, room_id: str, engine: str, override: EngineOverrides | None
@@ -329,27 +301,39 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
         normalized = normalize_overrides(override)
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._get_room_locked(room_id)
-            if normalized is None:
-                if room is None:
-                    return
-                overrides_dict = room.get("engine_overrides", {})
-                if isinstance(overrides_dict, dict):
-                    overrides_dict.pop(engine_key, None)
-                if self._room_is_empty(room):
-                    self._remove_room_locked(room_id)
-                self._save_locked()
-                return
-            room = self._ensure_room_locked(room_id)
-            if "engine_overrides" not in room or not isinstance(
-                room.get("engine_overrides"), dict
-            ):
-                room["engine_overrides"] = {}
-            room["engine_overrides"][engine_key] = {
-                "model": normalized.model,
-                "reasoning": normalized.reasoning,
-            }
-            self._save_locked()
+            await self._set_engine_override_locked(room_id, engine_key, normalized)
+
+    async def update_engine_override(
+        self,
+        room_id: str,
+        engine: str,
+        update: Callable[[EngineOverrides | None], EngineOverrides | None],
+    ) -> EngineOverrides | None:
+        """Read, update and write a room's engine overrides atomically.
+
+        The read-modify-write happens under a single lock hold, so concurrent
+        ``/model`` and ``/reasoning`` updates for the same engine do not
+        overwrite each other. Nothing is written when the update is a no-op.
+
+        Args:
+            room_id: The Matrix room ID.
+            engine: The engine ID to update overrides for.
+            update: Maps the current overrides (or None) to the new ones.
+
+        Returns:
+            The normalized overrides that were stored, or None if cleared.
+        """
+        engine_key = _normalize_engine_id(engine)
+        if engine_key is None:
+            return None
+        async with self._lock:
+            self._reload_locked_if_needed()
+            current = self._get_engine_override_locked(room_id, engine_key)
+            updated = normalize_overrides(update(current))
+            if updated == current:
+                return current
+            await self._set_engine_override_locked(room_id, engine_key, updated)
+            return updated
 
     async def clear_engine_override(self, room_id: str, engine: str) -> None:
         """Clear engine-specific overrides for a room."""
@@ -372,6 +356,68 @@ class RoomPrefsStore(JsonStateStore[_RoomPrefsState]):
         """Get room prefs dict, or None if room not in state."""
         return self._state.rooms.get(_room_key(room_id))
 
+    def _get_engine_override_locked(
+        self, room_id: str, engine_key: str
+    ) -> EngineOverrides | None:
+        room = self._get_room_locked(room_id)
+        if room is None:
+            return None
+        overrides_dict = room.get("engine_overrides", {})
+        if not isinstance(overrides_dict, dict):
+            return None
+        override_data = overrides_dict.get(engine_key)
+        if override_data is None or not isinstance(override_data, dict):
+            return None
+
+        # Type-safe extraction with validation
+        model = override_data.get("model")
+        reasoning = override_data.get("reasoning")
+
+        # Validate types - JSON could contain unexpected types
+        if model is not None and not isinstance(model, str):
+            logger.warning(
+                "matrix.room_prefs.invalid_model_type",
+                room_id=room_id,
+                engine=engine_key,
+                value_type=type(model).__name__,
+            )
+            model = None
+        if reasoning is not None and not isinstance(reasoning, str):
+            logger.warning(
+                "matrix.room_prefs.invalid_reasoning_type",
+                room_id=room_id,
+                engine=engine_key,
+                value_type=type(reasoning).__name__,
+            )
+            reasoning = None
+
+        return overrides_from_values(model, reasoning)
+
+    async def _set_engine_override_locked(
+        self, room_id: str, engine_key: str, normalized: EngineOverrides | None
+    ) -> None:
+        room = self._get_room_locked(room_id)
+        if normalized is None:
+            if room is None:
+                return
+            overrides_dict = room.get("engine_overrides", {})
+            if isinstance(overrides_dict, dict):
+                overrides_dict.pop(engine_key, None)
+            if self._room_is_empty(room):
+                self._remove_room_locked(room_id)
+            await self._save_locked()
+            return
+        room = self._ensure_room_locked(room_id)
+        if "engine_overrides" not in room or not isinstance(
+            room.get("engine_overrides"), dict
+        ):
+            room["engine_overrides"] = {}
+        room["engine_overrides"][engine_key] = {
+            "model": normalized.model,
+            "reasoning": normalized.reasoning,
+        }
+        await self._save_locked()
+
     def _ensure_room_locked(self, room_id: str) -> dict[str, Any]:
         """Get or create room prefs dict."""
         key = _room_key(room_id)
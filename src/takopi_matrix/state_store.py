@@ -24,7 +24,7 @@ def _atomic_write_json(path: Path, data: Any) -> None:
 
     tmp_path = path.with_suffix(".tmp")
     try:
-        tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+        tmp_path.write_bytes(json.dumps(data, indent=2, ensure_ascii=False).encode())
         tmp_path.replace(path)
     except Exception:
         if tmp_path.exists():
@@ -95,7 +95,7 @@ class JsonStateStore[T: _VersionedState]:
             self._state = self._state_factory()
             return
         try:
-            data = json.loads(self._path.read_text())
+            data = json.loads(self._path.read_bytes())
             loaded_version = data.get("version")
 
             # Try migration if version mismatch
@@ -143,8 +143,16 @@ class JsonStateStore[T: _VersionedState]:
             )
             self._state = self._state_factory()
 
-    def _save_locked(self) -> None:
-        # self._state is always a dataclass instance created by state_factory
-        payload = asdict(cast(Any, self._state))
+    def _write_locked(self, payload: dict[str, Any]) -> None:
         _atomic_write_json(self._path, payload)
         self._mtime_ns = self._stat_mtime_ns()
+
+    async def _save_locked(self) -> None:
+        """Persist the current state; the caller must hold ``self._lock``.
+
+        The state is snapshotted on the event loop and encoded and written on a
+        worker thread, so a slow disk doesn't stall unrelated rooms.
+        """
+        # self._state is always a dataclass instance created by state_factory
+        payload = asdict(cast(Any, self._state))
+        await anyio.to_thread.run_sync(self._write_locked, payload)
@@ -2,20 +2,25 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from takopi.api import ResumeToken, RunContext
 
-from .engine_overrides import EngineOverrides, normalize_overrides
+from .engine_overrides import (
+    EngineOverrides,
+    normalize_overrides,
+    overrides_from_values,
+)
 from .state_store import JsonStateStore
 
 STATE_VERSION = 1
 STATE_FILENAME = "matrix_thread_state.json"
 
 
-@dataclass
+@dataclass(slots=True)
 class _ThreadState:
     version: int
     rooms: dict[str, dict[str, dict[str, Any]]] = field(default_factory=dict)
@@ -81,11 +86,8 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            if not isinstance(room, dict):
-                return None
-            thread_state = room.get(thread_key)
-            if not isinstance(thread_state, dict):
+            thread_state = self._get_thread_locked(room_id, thread_key)
+            if thread_state is None:
                 return None
             sessions = thread_state.get("sessions")
             if not isinstance(sessions, dict):
@@ -111,7 +113,7 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
                 sessions = {}
                 thread_state["sessions"] = sessions
             sessions[engine_key] = resume_value
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_sessions(self, room_id: str, thread_root_event_id: str) -> None:
         thread_key = _normalize_text(thread_root_event_id)
@@ -130,7 +132,7 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
                 room.pop(thread_key, None)
             if not room:
                 self._state.rooms.pop(room_id, None)
-            self._save_locked()
+            await self._save_locked()
 
     async def get_context(
         self, room_id: str, thread_root_event_id: str
@@ -140,11 +142,8 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            if not isinstance(room, dict):
-                return None
-            thread_state = room.get(thread_key)
-            if not isinstance(thread_state, dict):
+            thread_state = self._get_thread_locked(room_id, thread_key)
+            if thread_state is None:
                 return None
             project = _normalize_text(thread_state.get("context_project"))
             branch = _normalize_text(thread_state.get("context_branch"))
@@ -176,12 +175,13 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
                     room.pop(thread_key, None)
                     if not room:
                         self._state.rooms.pop(room_id, None)
-                self._save_locked()
+                await self._save_locked()
                 return
-            thread_state = self._ensure_thread_locked(room_id, thread_key)
+            if not isinstance(thread_state, dict):
+                thread_state = self._ensure_thread_locked(room_id, thread_key)
             thread_state["context_project"] = project
             thread_state["context_branch"] = branch
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_context(self, room_id: str, thread_root_event_id: str) -> None:
         await self.set_context(room_id, thread_root_event_id, None)
@@ -194,11 +194,8 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            if not isinstance(room, dict):
-                return None
-            thread_state = room.get(thread_key)
-            if not isinstance(thread_state, dict):
+            thread_state = self._get_thread_locked(room_id, thread_key)
+            if thread_state is None:
                 return None
             return _normalize_text(thread_state.get("default_engine"))
 
@@ -224,11 +221,12 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
                     room.pop(thread_key, None)
                     if not room:
                         self._state.rooms.pop(room_id, None)
-                self._save_locked()
+                await self._save_locked()
                 return
-            thread_state = self._ensure_thread_locked(room_id, thread_key)
+            if not isinstance(thread_state, dict):
+                thread_state = self._ensure_thread_locked(room_id, thread_key)
             thread_state["default_engine"] = normalized_engine
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_default_engine(
         self, room_id: str, thread_root_event_id: str
@@ -243,11 +241,8 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            if not isinstance(room, dict):
-                return None
-            thread_state = room.get(thread_key)
-            if not isinstance(thread_state, dict):
+            thread_state = self._get_thread_locked(room_id, thread_key)
+            if thread_state is None:
                 return None
             mode = _normalize_text(thread_state.get("trigger_mode"))
             return "mentions" if mode == "mentions" else None
@@ -273,11 +268,12 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
                     room.pop(thread_key, None)
                     if not room:
                         self._state.rooms.pop(room_id, None)
-                self._save_locked()
+                await self._save_locked()
                 return
-            thread_state = self._ensure_thread_locked(room_id, thread_key)
+            if not isinstance(thread_state, dict):
+                thread_state = self._ensure_thread_locked(room_id, thread_key)
             thread_state["trigger_mode"] = normalized_mode
-            self._save_locked()
+            await self._save_locked()
 
     async def clear_trigger_mode(self, room_id: str, thread_root_event_id: str) -> None:
         await self.set_trigger_mode(room_id, thread_root_event_id, None)
@@ -291,27 +287,7 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return None
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            if not isinstance(room, dict):
-                return None
-            thread_state = room.get(thread_key)
-            if not isinstance(thread_state, dict):
-                return None
-            overrides = thread_state.get("engine_overrides")
-            if not isinstance(overrides, dict):
-                return None
-            value = overrides.get(engine_key)
-            if not isinstance(value, dict):
-                return None
-            model = value.get("model")
-            reasoning = value.get("reasoning")
-            if model is not None and not isinstance(model, str):
-                model = None
-            if reasoning is not None and not isinstance(reasoning, str):
-                reasoning = None
-            return normalize_overrides(
-                EngineOverrides(model=model, reasoning=reasoning)
-            )
+            return self._get_engine_override_locked(room_id, thread_key, engine_key)
 
     async def set_engine_override(
         self,
@@ -327,36 +303,100 @@ class MatrixThreadStateStore(JsonStateStore[_ThreadState]):
             return
         async with self._lock:
             self._reload_locked_if_needed()
-            room = self._state.rooms.get(room_id)
-            thread_state = room.get(thread_key) if isinstance(room, dict) else None
-            if normalized_override is None:
-                if not isinstance(thread_state, dict):
-                    return
-                overrides = thread_state.get("engine_overrides")
-                if isinstance(overrides, dict):
-                    overrides.pop(engine_key, None)
-                if self._thread_is_empty(thread_state):
-                    room.pop(thread_key, None)
-                    if not room:
-                        self._state.rooms.pop(room_id, None)
-                self._save_locked()
+            await self._set_engine_override_locked(
+                room_id, thread_key, engine_key, normalized_override
+            )
+
+    async def update_engine_override(
+        self,
+        room_id: str,
+        thread_root_event_id: str,
+        engine: str,
+        update: Callable[[EngineOverrides | None], EngineOverrides | None],
+    ) -> EngineOverrides | None:
+        """Apply ``update`` to the current override under a single lock hold."""
+        thread_key = _normalize_text(thread_root_event_id)
+        engine_key = _normalize_engine_id(engine)
+        if thread_key is None or engine_key is None:
+            return None
+        async with self._lock:
+            self._reload_locked_if_needed()
+            current = self._get_engine_override_locked(room_id, thread_key, engine_key)
+            updated = normalize_overrides(update(current))
+            if updated == current:
+                return current
+            await self._set_engine_override_locked(
+                room_id, thread_key, engine_key, updated
+            )
+            return updated
+
+    def _get_engine_override_locked(
+        self, room_id: str, thread_key: str, engine_key: str
+    ) -> EngineOverrides | None:
+        thread_state = self._get_thread_locked(room_id, thread_key)
+        if thread_state is None:
+            return None
+        overrides = thread_state.get("engine_overrides")
+        if not isinstance(overrides, dict):
+            return None
+        value = overrides.get(engine_key)
+        if not isinstance(value, dict):
+            return None
+        model = value.get("model")
+        reasoning = value.get("reasoning")
+        if model is not None and not isinstance(model, str):
+            model = None
+        if reasoning is not None and not isinstance(reasoning, str):
+            reasoning = None
+        return overrides_from_values(model, reasoning)
+
+    async def _set_engine_override_locked(
+        self,
+        room_id: str,
+        thread_key: str,
+        engine_key: str,
+        normalized_override: EngineOverrides | None,
+    ) -> None:
+        room = self._state.rooms.get(room_id)
+        thread_state = room.get(thread_key) if isinstance(room, dict) else None
+        if normalized_override is None:
+            if not isinstance(thread_state, dict):
                 return
-            thread_state = self._ensure_thread_locked(room_id, thread_key)
             overrides = thread_state.get("engine_overrides")
-            if not isinstance(overrides, dict):
-                overrides = {}
-                thread_state["engine_overrides"] = overrides
-            overrides[engine_key] = {
-                "model": normalized_override.model,
-                "reasoning": normalized_override.reasoning,
-            }
-            self._save_locked()
+            if isinstance(overrides, dict):
+                overrides.pop(engine_key, None)
+            if self._thread_is_empty(thread_state):
+                room.pop(thread_key, None)
+                if not room:
+                    self._state.rooms.pop(room_id, None)
+            await self._save_locked()
+            return
+        if not isinstance(thread_state, dict):
+            thread_state = self._ensure_thread_locked(room_id, thread_key)
+        overrides = thread_state.get("engine_overrides")
+        if not isinstance(overrides, dict):
+            overrides = {}
+            thread_state["engine_overrides"] = overrides
+        overrides[engine_key] = {
+            "model": normalized_override.model,
+            "reasoning": normalized_override.reasoning,
+        }
+        await self._save_locked()
 
     async def clear_engine_override(
         self, room_id: str, thread_root_event_id: str, engine: str
     ) -> None:
         await self.set_engine_override(room_id, thread_root_event_id, engine, None)
 
+    def _get_thread_locked(
+        self, room_id: str, thread_key: str
+    ) -> dict[str, Any] | None:
+        room = self._state.rooms.get(room_id)
+        if not isinstance(room, dict):
+            return None
+        thread_state = room.get(thread_key)
+        return thread_state if isinstance(thread_state, dict) else None
+
     def _ensure_thread_locked(
         self, room_id: str, thread_root_event_id: str
     ) -> dict[str, Any]:
@@ -14,7 +14,7 @@ logger = get_logger("takopi_matrix.verify_device")
 
 @dataclass(frozen=True)
 class _MatrixCreds:
-    homeserver: str
+    homeserver: str  # canonical: no trailing "/"
     user_id: str
     access_token: str
     device_id: str
@@ -48,12 +48,10 @@ def _env(name: str) -> str:
     return (os.environ.get(name) or "").strip()
 
 
-def _whoami(homeserver: str, token: str) -> dict[str, Any]:
-    hs = homeserver.rstrip("/")
-    response = httpx.get(
-        f"{hs}/_matrix/client/v3/account/whoami",
+def _whoami(http: httpx.Client, homeserver: str, token: str) -> dict[str, Any]:
+    response = http.get(
+        f"{homeserver}/_matrix/client/v3/account/whoami",
         headers={"Authorization": f"Bearer {token}"},
-        timeout=20.0,
     )
     if response.status_code == 401:
         raise RuntimeError("whoami unauthorized (401)")
@@ -64,7 +62,7 @@ def _whoami(homeserver: str, token: str) -> dict[str, Any]:
     return data
 
 
-def _resolve_creds(config_path: Path) -> _MatrixCreds:
+def _resolve_creds(config_path: Path, http: httpx.Client) -> _MatrixCreds:
     cfg = _load_takopi_toml(config_path)
     matrix_config = _cfg_get(cfg, "transports", "matrix")
     if not isinstance(matrix_config, dict):
@@ -79,23 +77,19 @@ def _resolve_creds(config_path: Path) -> _MatrixCreds:
         raise ValueError("Missing transports.matrix.homeserver")
     if not user_id:
         raise ValueError("Missing transports.matrix.user_id")
-    if (
-        not cfg_access_token
-        and not _env("matrix_access_token")
-        and not _env("MATRIX_ACCESS_TOKEN")
-    ):
+    env_access_token = _env("matrix_access_token") or _env("MATRIX_ACCESS_TOKEN")
+    if not cfg_access_token and not env_access_token:
         raise ValueError(
             "Missing transports.matrix.access_token (or env matrix_access_token)"
         )
 
-    env_access_token = _env("matrix_access_token") or _env("MATRIX_ACCESS_TOKEN")
     env_device_id = _env("matrix_device_id") or _env("MATRIX_DEVICE_ID")
 
     access_token = env_access_token or cfg_access_token
     token_source = "env" if env_access_token else "config"
 
     try:
-        who = _whoami(homeserver, access_token)
+        who = _whoami(http, homeserver, access_token)
     except Exception as exc:
         if token_source == "env" and cfg_access_token:
             logger.warning(
@@ -103,7 +97,7 @@ def _resolve_creds(config_path: Path) -> _MatrixCreds:
                 error=str(exc),
             )
             access_token = cfg_access_token
-            who = _whoami(homeserver, access_token)
+            who = _whoami(http, homeserver, access_token)
             token_source = "config"
         else:
             raise
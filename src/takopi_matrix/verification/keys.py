@@ -6,13 +6,16 @@ import httpx
 from nio.crypto.device import OlmDevice
 
 
-def _keys_query(homeserver: str, token: str, user_id: str) -> dict[str, Any]:
-    hs = homeserver.rstrip("/")
-    response = httpx.post(
-        f"{hs}/_matrix/client/v3/keys/query",
+_DEVICE_KEY_ALGORITHMS = frozenset({"curve25519", "ed25519"})
+
+
+def _keys_query(
+    http: httpx.Client, homeserver: str, token: str, user_id: str
+) -> dict[str, Any]:
+    response = http.post(
+        f"{homeserver}/_matrix/client/v3/keys/query",
         headers={"Authorization": f"Bearer {token}"},
         json={"device_keys": {user_id: []}},
-        timeout=20.0,
     )
     response.raise_for_status()
     data = response.json()
@@ -32,10 +35,9 @@ def _extract_olm_device(
     for key, value in keys.items():
         if not isinstance(key, str) or not isinstance(value, str):
             continue
-        if key.startswith("curve25519:"):
-            norm_keys["curve25519"] = value
-        elif key.startswith("ed25519:"):
-            norm_keys["ed25519"] = value
+        algorithm, sep, _ = key.partition(":")
+        if sep and algorithm in _DEVICE_KEY_ALGORITHMS:
+            norm_keys[algorithm] = value
 
     display_name = ""
     unsigned = info.get("unsigned") or {}
@@ -4,6 +4,7 @@ import asyncio
 from contextlib import suppress
 from typing import Any
 
+import httpx
 import nio
 from nio.events.to_device import UnknownToDeviceEvent
 
@@ -160,7 +161,11 @@ def _patch_olm_for_verification(
 
 
 async def _init_crypto(
-    client: nio.AsyncClient, *, creds: _MatrixCreds, debug_events: bool
+    client: nio.AsyncClient,
+    *,
+    creds: _MatrixCreds,
+    http: httpx.Client,
+    debug_events: bool,
 ) -> None:
     load_store = getattr(client, "load_store", None)
     if callable(load_store):
@@ -175,7 +180,7 @@ async def _init_crypto(
             print(f"[debug] keys_upload skipped: {exc!r}", flush=True)
 
     data = await asyncio.to_thread(
-        _keys_query, creds.homeserver, creds.access_token, creds.user_id
+        _keys_query, http, creds.homeserver, creds.access_token, creds.user_id
     )
     dev_map = (data.get("device_keys", {}) or {}).get(creds.user_id, {}) or {}
     info = dev_map.get(creds.device_id) if isinstance(dev_map, dict) else None
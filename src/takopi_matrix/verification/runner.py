@@ -6,6 +6,7 @@ import sys
 import time
 from typing import Any
 
+import httpx
 import nio
 from nio.crypto.device import OlmDevice
 from nio.crypto.sas import Sas
@@ -25,7 +26,13 @@ from .nio_types import (
     KeyVerificationStart,
 )
 from .olm_patch import _init_crypto
-from .send import _send_encrypted, _send_plain, _send_verif, _tx_id
+from .send import (
+    _claim_missing_sessions,
+    _send_encrypted,
+    _send_plain,
+    _send_verif,
+    _tx_id,
+)
 
 logger = get_logger("takopi_matrix.verify_device")
 
@@ -33,6 +40,7 @@ logger = get_logger("takopi_matrix.verify_device")
 async def _run_verifier(
     *,
     creds: _MatrixCreds,
+    http: httpx.Client,
     allowed_senders: set[str],
     auto_confirm: bool,
     max_wait_seconds: int,
@@ -143,7 +151,7 @@ async def _run_verifier(
             return device_by_id[dev_id]
 
         data = await asyncio.to_thread(
-            _keys_query, creds.homeserver, creds.access_token, owner
+            _keys_query, http, creds.homeserver, creds.access_token, owner
         )
         dev_map = (data.get("device_keys", {}) or {}).get(owner, {}) or {}
         info = dev_map.get(dev_id) if isinstance(dev_map, dict) else None
@@ -164,7 +172,7 @@ async def _run_verifier(
 
         try:
             data = await asyncio.to_thread(
-                _keys_query, creds.homeserver, creds.access_token, initiate_to
+                _keys_query, http, creds.homeserver, creds.access_token, initiate_to
             )
         except Exception as exc:
             print(
@@ -223,10 +231,18 @@ async def _run_verifier(
                 flush=True,
             )
 
+        targets = [
+            (dev_id, dev)
+            for dev_id, dev in sorted(device_by_id.items())
+            if not initiate_device_ids or str(dev_id) in initiate_device_ids
+        ]
+        if send_encrypted:
+            await _claim_missing_sessions(
+                client, [dev for _, dev in targets], debug_events=debug_events
+            )
+
         sent_count = 0
-        for dev_id, dev in sorted(device_by_id.items()):
-            if initiate_device_ids and str(dev_id) not in initiate_device_ids:
-                continue
+        for dev_id, dev in targets:
             txn = _tx_id()
             content = {
                 "from_device": creds.device_id,
@@ -807,7 +823,7 @@ async def _run_verifier(
     )
 
     try:
-        await _init_crypto(client, creds=creds, debug_events=debug_events)
+        await _init_crypto(client, creds=creds, http=http, debug_events=debug_events)
         sync_task = asyncio.create_task(
             client.sync_forever(timeout=30000, full_state=True)
         )
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-import uuid
+import asyncio
+import secrets
+from collections.abc import Coroutine, Iterable
 from typing import Any
 
 import nio
@@ -9,14 +11,14 @@ from nio.event_builders.direct_messages import ToDeviceMessage
 
 
 def _tx_id() -> str:
-    return str(uuid.uuid4())
+    return secrets.token_hex(16)
 
 
 async def _send_plain(
     client: nio.AsyncClient, msg: ToDeviceMessage, *, debug_events: bool
 ) -> None:
     response = await client.to_device(msg, tx_id=_tx_id())
-    if response.__class__.__name__.endswith("Error"):
+    if isinstance(response, nio.ToDeviceError):
         print(
             f"[verifier] send failed type={msg.type} to={msg.recipient}:{msg.recipient_device} ({response.__class__.__name__})",
             flush=True,
@@ -28,6 +30,26 @@ async def _send_plain(
         )
 
 
+async def _claim_missing_sessions(
+    client: nio.AsyncClient, targets: Iterable[OlmDevice], *, debug_events: bool
+) -> None:
+    """Claim one-time keys for all targets lacking an Olm session in one request."""
+    olm = getattr(client, "olm", None)
+    if olm is None:
+        return
+    missing: dict[str, list[str]] = {}
+    for target in targets:
+        if not olm.session_store.get(target.curve25519):
+            missing.setdefault(target.user_id, []).append(target.id)
+    if not missing:
+        return
+    try:
+        await client.keys_claim(missing)
+    except Exception as exc:
+        if debug_events:
+            print(f"[debug] batched keys_claim failed: {exc!r}", flush=True)
+
+
 async def _send_encrypted(
     client: nio.AsyncClient,
     target: OlmDevice,
@@ -74,7 +96,7 @@ async def _send_encrypted(
     olm_dict = encrypt_fn(session, target, inner_type, inner_content)
     msg = ToDeviceMessage("m.room.encrypted", target.user_id, target.id, olm_dict)
     response = await client.to_device(msg, tx_id=_tx_id())
-    if response.__class__.__name__.endswith("Error"):
+    if isinstance(response, nio.ToDeviceError):
         print(
             f"[verifier] encrypted send failed inner={inner_type} to={target.user_id}:{target.id} ({response.__class__.__name__})",
             flush=True,
@@ -96,17 +118,30 @@ async def _send_verif(
     send_encrypted: bool,
     debug_events: bool,
 ) -> None:
+    sends: list[Coroutine[Any, Any, None]] = []
     if send_plaintext:
-        await _send_plain(
-            client,
-            ToDeviceMessage(inner_type, target.user_id, target.id, inner_content),
-            debug_events=debug_events,
+        sends.append(
+            _send_plain(
+                client,
+                ToDeviceMessage(inner_type, target.user_id, target.id, inner_content),
+                debug_events=debug_events,
+            )
         )
     if send_encrypted:
-        await _send_encrypted(
-            client,
-            target,
-            inner_type,
-            inner_content,
-            debug_events=debug_events,
+        sends.append(
+            _send_encrypted(
+                client,
+                target,
+                inner_type,
+                inner_content,
+                debug_events=debug_events,
+            )
         )
+    # Both channels go out together; a failure in one must not cut the other
+    # short, but still surfaces to the caller once both have finished.
+    results = await asyncio.gather(*sends, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if len(errors) == 1:
+        raise errors[0]
+    if errors:
+        raise BaseExceptionGroup("verification sends failed", errors)
@@ -15,6 +15,8 @@ import asyncio
 import sys
 from pathlib import Path
 
+import httpx
+
 from .verification.creds import _expand_path, _resolve_creds
 from .verification.keys import _extract_olm_device
 from .verification.lock import _try_lock
@@ -57,37 +59,41 @@ def run_verify_device(
         )
         return 2
 
-    try:
-        creds = _resolve_creds(cfg_path)
-    except Exception as exc:
-        print(f"Failed to load Matrix config: {exc}", file=sys.stderr)
-        return 2
+    # One client for the whole run so whoami and keys/query share pooled
+    # connections; it is closed when verification ends.
+    with httpx.Client(timeout=20.0) as http:
+        try:
+            creds = _resolve_creds(cfg_path, http)
+        except Exception as exc:
+            print(f"Failed to load Matrix config: {exc}", file=sys.stderr)
+            return 2
 
-    try:
-        return asyncio.run(
-            _run_verifier(
-                creds=creds,
-                allowed_senders={s.strip() for s in allowed_senders if s.strip()},
-                auto_confirm=bool(auto_confirm),
-                max_wait_seconds=int(max_wait_seconds),
-                debug_events=bool(debug_events),
-                send_plaintext=bool(send_plaintext),
-                send_encrypted=bool(send_encrypted),
-                initiate_to=str(initiate_to).strip(),
-                initiate_device_ids={
-                    s.strip() for s in initiate_device_ids if s.strip()
-                },
-                initiate_retries=max(1, int(initiate_retries)),
-                initiate_retry_interval_seconds=max(
-                    0, int(initiate_retry_interval_seconds)
-                ),
-                broadcast_request=broadcast_request,
-                verify_all=bool(verify_all),
-            )
-        )
-    finally:
         try:
-            if lock_fh is not None:
-                lock_fh.close()
-        except Exception:
-            pass
+            return asyncio.run(
+                _run_verifier(
+                    creds=creds,
+                    http=http,
+                    allowed_senders={s.strip() for s in allowed_senders if s.strip()},
+                    auto_confirm=bool(auto_confirm),
+                    max_wait_seconds=int(max_wait_seconds),
+                    debug_events=bool(debug_events),
+                    send_plaintext=bool(send_plaintext),
+                    send_encrypted=bool(send_encrypted),
+                    initiate_to=str(initiate_to).strip(),
+                    initiate_device_ids={
+                        s.strip() for s in initiate_device_ids if s.strip()
+                    },
+                    initiate_retries=max(1, int(initiate_retries)),
+                    initiate_retry_interval_seconds=max(
+                        0, int(initiate_retry_interval_seconds)
+                    ),
+                    broadcast_request=broadcast_request,
+                    verify_all=bool(verify_all),
+                )
+            )
+        finally:
+            try:
+                if lock_fh is not None:
+                    lock_fh.close()
+            except Exception:
+                pass
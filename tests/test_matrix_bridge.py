@@ -154,6 +154,18 @@ def test_parse_slash_command_leading_whitespace() -> None:
     assert args == "arg"
 
 
+def test_normalize_slash_prefix_collapses_only_first_slash() -> None:
+    """Only the first slash of a leading // is dropped; whitespace is kept."""
+    from takopi_matrix.bridge.commands.parse import normalize_slash_prefix
+
+    assert normalize_slash_prefix("//cmd") == "/cmd"
+    assert normalize_slash_prefix("  //cmd x") == "  /cmd x"
+    assert normalize_slash_prefix("///cmd") == "//cmd"
+    assert normalize_slash_prefix("/cmd") == "/cmd"
+    assert normalize_slash_prefix("plain //text") == "plain //text"
+    assert normalize_slash_prefix("") == ""
+
+
 # --- split_command_args tests ---
 
 
@@ -172,6 +184,14 @@ def test_split_command_args_empty() -> None:
     assert split_command_args("   ") == ()
 
 
+def test_split_command_args_unquoted_matches_shlex_whitespace() -> None:
+    """Unquoted text splits on shlex whitespace only."""
+    from takopi_matrix.bridge.commands.parse import split_command_args
+
+    assert split_command_args(" set\tcodex\r\n gpt-5 ") == ("set", "codex", "gpt-5")
+    assert split_command_args("a\xa0b c") == ("a\xa0b", "c")
+
+
 def test_split_command_args_quoted() -> None:
     """Quoted arguments are preserved."""
     from takopi_matrix.bridge.commands.parse import split_command_args
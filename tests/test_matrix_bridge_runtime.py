@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, NamedTuple
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -15,29 +16,30 @@ from takopi_matrix.bridge.runtime import (
     _initialize_e2ee_if_available,
     _trust_room_devices_if_e2ee,
     _startup_sequence,
+    _resolve_own_display_name,
 )
 
 
 # --- Test fixtures ---
 
 
+class SendCall(NamedTuple):
+    channel_id: str
+    message: RenderedMessage
+    options: Any
+
+
 class FakeTransport:
     """Fake transport for testing."""
 
     def __init__(self):
-        self.send_calls: list[dict] = []
+        self.send_calls: list[SendCall] = []
         self._next_id = 1
 
     async def send(self, *, channel_id, message, options=None) -> MessageRef | None:
         ref = MessageRef(channel_id=channel_id, message_id=f"$sent{self._next_id}")
         self._next_id += 1
-        self.send_calls.append(
-            {
-                "channel_id": channel_id,
-                "message": message,
-                "options": options,
-            }
-        )
+        self.send_calls.append(SendCall(channel_id, message, options))
         return ref
 
 
@@ -72,7 +74,7 @@ class FakeClient:
         self.trust_calls: list[str] = []
         self.ensure_keys_calls: list[str] = []
         self.typing_calls: list[tuple[str, bool]] = []
-        self._display_name = "Bot"
+        self._display_name: str | None = "Bot"
 
     async def login(self) -> bool:
         return self._login_result
@@ -187,8 +189,10 @@ async def test_persist_new_rooms_duplicate_ignored(tmp_path: Path) -> None:
         '[transports.matrix]\nroom_ids = ["!existing:example.org"]\n'
     )
 
-    # Try to add existing room
-    await _persist_new_rooms(["!existing:example.org"], config_path)
+    # Try to add existing room; no style-preserving parse is needed for that
+    with patch("tomlkit.parse") as parse:
+        await _persist_new_rooms(["!existing:example.org"], config_path)
+    parse.assert_not_called()
 
     # File should not have changed (or has same content)
     import tomlkit
@@ -246,7 +250,7 @@ async def test_send_startup_sends_to_all_rooms() -> None:
     await _send_startup(cfg)  # type: ignore
 
     assert len(cfg.exec_cfg.transport.send_calls) == 2
-    channels = [c["channel_id"] for c in cfg.exec_cfg.transport.send_calls]
+    channels = [c.channel_id for c in cfg.exec_cfg.transport.send_calls]
     assert "!room1:example.org" in channels
     assert "!room2:example.org" in channels
 
@@ -260,7 +264,49 @@ async def test_send_startup_uses_configured_message() -> None:
     await _send_startup(cfg)  # type: ignore
 
     call = cfg.exec_cfg.transport.send_calls[0]
-    assert "Custom startup message" in call["message"].text
+    assert "Custom startup message" in call.message.text
+
+
+@pytest.mark.anyio
+async def test_send_startup_renders_once() -> None:
+    """_send_startup renders the message once and shares it across rooms."""
+    from takopi_matrix.bridge import runtime
+
+    cfg = FakeMatrixBridgeConfig()
+
+    with patch.object(
+        runtime, "prepare_matrix", wraps=runtime.prepare_matrix
+    ) as prepare:
+        await _send_startup(cfg)  # type: ignore
+
+    prepare.assert_called_once()
+    first, second = cfg.exec_cfg.transport.send_calls
+    assert first.message is second.message
+
+
+@pytest.mark.anyio
+async def test_send_startup_sends_rooms_concurrently() -> None:
+    """_send_startup has every room's send in flight at once."""
+    import anyio
+
+    cfg = FakeMatrixBridgeConfig()
+    transport = cfg.exec_cfg.transport
+    all_started = anyio.Event()
+    original_send = transport.send
+
+    async def send(**kwargs):
+        ref = await original_send(**kwargs)
+        if len(transport.send_calls) == len(cfg.room_ids):
+            all_started.set()
+        await all_started.wait()
+        return ref
+
+    transport.send = send  # type: ignore[method-assign]
+
+    with anyio.fail_after(5):
+        await _send_startup(cfg)  # type: ignore
+
+    assert len(transport.send_calls) == 2
 
 
 # --- _initialize_e2ee_if_available tests ---
@@ -336,6 +382,33 @@ async def test_trust_room_devices_all_rooms() -> None:
     assert len(client.ensure_keys_calls) == 2
 
 
+@pytest.mark.anyio
+async def test_trust_room_devices_rooms_run_sequentially() -> None:
+    """Each room finishes sharing keys before the next room starts."""
+    client = FakeClient()
+    client.e2ee_available = True
+    cfg = FakeMatrixBridgeConfig(client=client)
+    order: list[tuple[str, str]] = []
+
+    async def trust(room_id: str) -> None:
+        order.append(("trust", room_id))
+
+    async def ensure(room_id: str) -> None:
+        order.append(("keys", room_id))
+
+    client.trust_room_devices = trust  # type: ignore[method-assign]
+    client.ensure_room_keys = ensure  # type: ignore[method-assign]
+
+    await _trust_room_devices_if_e2ee(cfg)  # type: ignore
+
+    assert order == [
+        ("trust", "!room1:example.org"),
+        ("keys", "!room1:example.org"),
+        ("trust", "!room2:example.org"),
+        ("keys", "!room2:example.org"),
+    ]
+
+
 # --- _startup_sequence tests ---
 
 
@@ -382,6 +455,27 @@ async def test_startup_sequence_with_e2ee() -> None:
     assert len(client.ensure_keys_calls) == 2
 
 
+# --- _resolve_own_display_name tests ---
+
+
+@pytest.mark.anyio
+async def test_resolve_own_display_name() -> None:
+    """_resolve_own_display_name returns the client's display name."""
+    cfg = FakeMatrixBridgeConfig()
+
+    assert await _resolve_own_display_name(cfg) == "Bot"  # type: ignore
+
+
+@pytest.mark.anyio
+async def test_resolve_own_display_name_not_available() -> None:
+    """_resolve_own_display_name returns None when no name is set."""
+    client = FakeClient()
+    client._display_name = None
+    cfg = FakeMatrixBridgeConfig(client=client)
+
+    assert await _resolve_own_display_name(cfg) is None  # type: ignore
+
+
 # --- _is_reply_to_bot_message tests ---
 
 
@@ -2,36 +2,68 @@
 
 from __future__ import annotations
 
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, NamedTuple
 from unittest.mock import AsyncMock
 
+import anyio
 import pytest
 from takopi.api import RunContext
 
-from matrix_fixtures import make_matrix_message
+from matrix_fixtures import make_matrix_file, make_matrix_message
 import takopi_matrix.bridge.commands.builtin as builtin_commands
 from takopi_matrix.bridge.commands.builtin import handle_builtin_command
+from takopi_matrix.engine_overrides import EngineOverrides
+
+
+class _SendCall(NamedTuple):
+    channel_id: str
+    text: str
+    options: Any
 
 
 class _FakeTransport:
     def __init__(self) -> None:
-        self.calls: list[dict[str, object]] = []
+        self.calls: list[_SendCall] = []
 
     async def send(self, *, channel_id, message, options=None):
-        self.calls.append(
-            {
-                "channel_id": channel_id,
-                "text": message.text,
-                "options": options,
-            }
-        )
+        self.calls.append(_SendCall(channel_id, message.text, options))
         return None
 
 
+@dataclass(slots=True)
+class _FakeRuntime:
+    normalize_project_key: Callable[[str], str]
+    project_alias_for_key: Callable[[str], str]
+    engine_ids: tuple[str, ...]
+    default_engine: str
+    project_default_engine: Callable[[Any], str | None]
+    project_aliases: Callable[[], tuple[str, ...]]
+    config_path: Path | None
+    resolve_run_cwd: Callable[[Any], Path | None]
+    resolve_message: Callable[..., Any]
+
+
+@dataclass(slots=True)
+class _FakeCfg:
+    exec_cfg: Any
+    runtime: _FakeRuntime
+    room_prefs: AsyncMock
+    thread_state: AsyncMock
+    chat_sessions: AsyncMock
+    room_project_map: Any
+    file_download: Any
+    client: AsyncMock
+    user_allowlist: set[str] | None
+
+
 def _build_cfg() -> tuple[Any, _FakeTransport]:
     transport = _FakeTransport()
-    runtime = SimpleNamespace(
+    runtime = _FakeRuntime(
         normalize_project_key=lambda token: token.lower(),
         project_alias_for_key=lambda key: key,
         engine_ids=("codex", "claude"),
@@ -56,7 +88,7 @@ def _build_cfg() -> tuple[Any, _FakeTransport]:
     client.is_direct_room = AsyncMock(return_value=True)
     client.is_room_admin = AsyncMock(return_value=True)
     client.send_file = AsyncMock(return_value={"event_id": "$file"})
-    cfg = SimpleNamespace(
+    cfg = _FakeCfg(
         exec_cfg=SimpleNamespace(transport=transport),
         runtime=runtime,
         room_prefs=room_prefs,
@@ -205,7 +237,7 @@ async def test_file_put_without_attachment_returns_usage() -> None:
 
     assert handled is True
     assert transport.calls
-    assert "usage: `/file put <path>`" in str(transport.calls[-1]["text"])
+    assert "usage: `/file put <path>`" in transport.calls[-1].text
 
 
 @pytest.mark.anyio
@@ -225,7 +257,7 @@ async def test_agent_set_denied_without_admin_or_private() -> None:
 
     assert handled is True
     cfg.room_prefs.set_default_engine.assert_not_called()
-    assert "restricted to room admins" in str(transport.calls[-1]["text"])
+    assert "restricted to room admins" in transport.calls[-1].text
 
 
 @pytest.mark.anyio
@@ -250,4 +282,320 @@ async def test_reload_requests_process_restart(monkeypatch) -> None:
 
     assert handled is True
     assert restarted is True
-    assert "restarting takopi process now" in str(transport.calls[-1]["text"])
+    assert "restarting takopi process now" in transport.calls[-1].text
+
+
+def test_parse_command_defaults_to_show_action() -> None:
+    parsed = builtin_commands._parse_command("")
+
+    assert parsed.tokens == ()
+    assert parsed.action == "show"
+
+
+def test_parse_command_lowercases_action_only() -> None:
+    parsed = builtin_commands._parse_command("SET Codex GPT-5")
+
+    assert parsed.tokens == ("SET", "Codex", "GPT-5")
+    assert parsed.action == "set"
+
+
+@pytest.mark.anyio
+async def test_resolve_message_offloads_long_text_to_worker_thread() -> None:
+    cfg, _transport = _build_cfg()
+    loop_thread = threading.get_ident()
+    seen_threads: list[int] = []
+
+    def _resolve(**kwargs: Any) -> SimpleNamespace:
+        seen_threads.append(threading.get_ident())
+        return SimpleNamespace(context=None, context_source="ambient")
+
+    cfg.runtime.resolve_message = _resolve
+    threshold = builtin_commands.RESOLVE_MESSAGE_THREAD_THRESHOLD
+
+    await builtin_commands._resolve_message(
+        cfg, text="short", reply_text=None, ambient_context=None
+    )
+    await builtin_commands._resolve_message(
+        cfg, text="x" * (threshold + 1), reply_text=None, ambient_context=None
+    )
+
+    assert seen_threads[0] == loop_thread
+    assert seen_threads[1] != loop_thread
+
+
+@pytest.mark.anyio
+async def test_reasoning_show_renders_resolved_override() -> None:
+    cfg, transport = _build_cfg()
+    cfg.room_prefs.get_engine_override = AsyncMock(
+        return_value=EngineOverrides(model=None, reasoning="high")
+    )
+    msg = make_matrix_message(text="/reasoning")
+
+    handled = await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="reasoning",
+        args_text="",
+        ambient_context=None,
+    )
+
+    assert handled is True
+    assert transport.calls[-1].text == (
+        "engine: codex (global default)\n\n"
+        "reasoning: high (room default)\n\n"
+        "defaults: thread: none, room: high\n\n"
+        "available levels: minimal, low, medium, high, xhigh"
+    )
+
+
+@pytest.mark.anyio
+async def test_model_show_reads_thread_and_room_overrides_in_thread() -> None:
+    cfg, transport = _build_cfg()
+    cfg.thread_state.get_engine_override = AsyncMock(
+        return_value=EngineOverrides(model="gpt-5", reasoning=None)
+    )
+    cfg.room_prefs.get_engine_override = AsyncMock(
+        return_value=EngineOverrides(model="gpt-4.1", reasoning=None)
+    )
+    msg = make_matrix_message(text="/model", thread_root_event_id="$thread-root")
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="model",
+        args_text="",
+        ambient_context=None,
+    )
+
+    cfg.thread_state.get_engine_override.assert_awaited_once_with(
+        msg.room_id, "$thread-root", "codex"
+    )
+    cfg.room_prefs.get_engine_override.assert_awaited_once_with(msg.room_id, "codex")
+    text = transport.calls[-1].text
+    assert "model: gpt-5 (thread override)" in text
+    assert "defaults: thread: gpt-5, room: gpt-4.1" in text
+
+
+@pytest.mark.anyio
+async def test_replies_thread_to_the_command_event() -> None:
+    cfg, transport = _build_cfg()
+    msg = make_matrix_message(text="/trigger bogus")
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="trigger",
+        args_text="bogus",
+        ambient_context=None,
+    )
+
+    call = transport.calls[-1]
+    assert call.channel_id == msg.room_id
+    assert call.text == builtin_commands.TRIGGER_USAGE
+    assert call.options.reply_to.channel_id == msg.room_id
+    assert call.options.reply_to.message_id == msg.event_id
+    assert call.options.notify is True
+
+
+@pytest.mark.anyio
+async def test_trigger_show_reports_thread_override_source() -> None:
+    cfg, transport = _build_cfg()
+    cfg.thread_state.get_trigger_mode = AsyncMock(return_value="mentions")
+    cfg.room_prefs.get_trigger_mode = AsyncMock(return_value=None)
+    msg = make_matrix_message(text="/trigger", thread_root_event_id="$thread-root")
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="trigger",
+        args_text="",
+        ambient_context=None,
+    )
+
+    assert transport.calls[-1].text == (
+        "trigger: mentions (thread override)\n\n"
+        "defaults: thread: mentions, room: none\n\n"
+        "available: all, mentions"
+    )
+
+
+def test_override_updaters_keep_the_other_field() -> None:
+    current = EngineOverrides(model="gpt-5", reasoning="low")
+
+    assert builtin_commands._SetModel("o3")(current) == EngineOverrides(
+        model="o3", reasoning="low"
+    )
+    assert builtin_commands._SetReasoning(None)(current) == EngineOverrides(
+        model="gpt-5", reasoning=None
+    )
+    assert builtin_commands._SetModel("o3")(None) == EngineOverrides(model="o3")
+
+
+@pytest.mark.anyio
+async def test_reasoning_set_rejects_unknown_level() -> None:
+    cfg, transport = _build_cfg()
+    msg = make_matrix_message(text="/reasoning set turbo")
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="reasoning",
+        args_text="set turbo",
+        ambient_context=None,
+    )
+
+    assert transport.calls[-1].text.startswith("unknown reasoning level `turbo`.")
+    cfg.room_prefs.update_engine_override.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_model_set_for_explicit_engine_updates_room_override() -> None:
+    cfg, transport = _build_cfg()
+    msg = make_matrix_message(text="/model set claude opus")
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="model",
+        args_text="set claude opus",
+        ambient_context=None,
+    )
+
+    room_id, engine, update = cfg.room_prefs.update_engine_override.await_args.args
+    assert (room_id, engine) == (msg.room_id, "claude")
+    assert update(None) == EngineOverrides(model="opus")
+    assert transport.calls[-1].text.startswith(
+        "room model override set to `opus` for `claude`."
+    )
+
+
+@pytest.mark.anyio
+async def test_file_put_downloads_attachments_concurrently_in_order(
+    tmp_path: Path,
+) -> None:
+    cfg, transport = _build_cfg()
+    cfg.runtime.resolve_run_cwd = lambda context: tmp_path
+    started: list[str] = []
+    both_started = anyio.Event()
+
+    async def _download(mxc_url: str, **kwargs: Any) -> bytes:
+        started.append(mxc_url)
+        if len(started) == 2:
+            both_started.set()
+        await both_started.wait()
+        return mxc_url.encode()
+
+    cfg.client.download_file = _download
+    msg = make_matrix_message(
+        text="/file put docs/",
+        attachments=[
+            make_matrix_file(mxc_url="mxc://example.org/a", filename="a.txt"),
+            make_matrix_file(mxc_url="mxc://example.org/b", filename="b.txt"),
+        ],
+    )
+
+    with anyio.fail_after(5):
+        await handle_builtin_command(
+            cfg,
+            msg,
+            command_id="file",
+            args_text="put docs/",
+            ambient_context=RunContext(project="website"),
+        )
+
+    assert (tmp_path / "docs" / "a.txt").read_bytes() == b"mxc://example.org/a"
+    assert (tmp_path / "docs" / "b.txt").read_bytes() == b"mxc://example.org/b"
+    text = transport.calls[-1].text
+    assert text.index("docs/a.txt") < text.index("docs/b.txt")
+
+
+@pytest.mark.anyio
+async def test_file_get_reports_missing_and_oversized_files(tmp_path: Path) -> None:
+    cfg, transport = _build_cfg()
+    cfg.runtime.resolve_run_cwd = lambda context: tmp_path
+    cfg.file_download = SimpleNamespace(max_size_bytes=4)
+    (tmp_path / "big.txt").write_bytes(b"too large")
+    context = RunContext(project="website")
+
+    await handle_builtin_command(
+        cfg,
+        make_matrix_message(text="/file get missing.txt"),
+        command_id="file",
+        args_text="get missing.txt",
+        ambient_context=context,
+    )
+    assert transport.calls[-1].text == "file does not exist."
+
+    await handle_builtin_command(
+        cfg,
+        make_matrix_message(text="/file get big.txt"),
+        command_id="file",
+        args_text="get big.txt",
+        ambient_context=context,
+    )
+    assert transport.calls[-1].text == "file is too large to send."
+    cfg.client.send_file.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_file_put_bounds_attachments_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(builtin_commands, "FILE_PUT_MAX_IN_FLIGHT", 2)
+    cfg, transport = _build_cfg()
+    cfg.runtime.resolve_run_cwd = lambda context: tmp_path
+    in_flight = 0
+    peak = 0
+
+    async def _download(mxc_url: str, **kwargs: Any) -> bytes:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return mxc_url.encode()
+
+    cfg.client.download_file = _download
+    names = [f"f{idx}.txt" for idx in range(5)]
+    msg = make_matrix_message(
+        text="/file put docs/",
+        attachments=[
+            make_matrix_file(mxc_url=f"mxc://example.org/{name}", filename=name)
+            for name in names
+        ],
+    )
+
+    await handle_builtin_command(
+        cfg,
+        msg,
+        command_id="file",
+        args_text="put docs/",
+        ambient_context=RunContext(project="website"),
+    )
+
+    assert peak == 2
+    assert sorted(path.name for path in (tmp_path / "docs").iterdir()) == names
+    text = transport.calls[-1].text
+    assert [text.index(f"docs/{name}") for name in names] == sorted(
+        text.index(f"docs/{name}") for name in names
+    )
+
+
+def test_check_put_target_reports_reasons(tmp_path: Path) -> None:
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("x")
+    check = builtin_commands._check_put_target
+
+    assert check(tmp_path, Path("docs"), True) == (None, "target is directory")
+    assert check(tmp_path, Path("docs/a.txt"), False) == (
+        None,
+        "file exists; use --force to overwrite",
+    )
+    assert check(tmp_path, Path("docs/a.txt"), True) == (
+        tmp_path / "docs" / "a.txt",
+        None,
+    )
+    assert check(tmp_path, Path("../escape.txt"), True) == (
+        None,
+        "path escapes repo root",
+    )
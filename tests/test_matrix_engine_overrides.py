@@ -12,6 +12,7 @@ from takopi_matrix.engine_overrides import (
     merge_overrides,
     normalize_override_value,
     normalize_overrides,
+    overrides_from_values,
     resolve_override_value,
     supports_reasoning,
 )
@@ -79,6 +80,17 @@ class TestNormalizeOverrides:
         assert result.reasoning == "high"
 
 
+class TestOverridesFromValues:
+    def test_empty_values_return_none(self) -> None:
+        """Blank raw values collapse to None."""
+        assert overrides_from_values(None, "  ") is None
+
+    def test_normalizes_raw_values(self) -> None:
+        """Raw values are stripped into a single EngineOverrides."""
+        result = overrides_from_values(" gpt-4 ", None)
+        assert result == EngineOverrides(model="gpt-4", reasoning=None)
+
+
 class TestMergeOverrides:
     def test_both_none_returns_none(self) -> None:
         """Both None returns None."""
@@ -169,3 +169,13 @@ class TestRoomPrefsStore:
         # Should reload and see new value
         result = await store.get_default_engine(room_id)
         assert result == "sonnet"
+
+    @pytest.mark.anyio
+    async def test_persists_utf8(self, prefs_path: Path) -> None:
+        """State is written as readable UTF-8 and read back."""
+        room_id = "!räum:example.org"
+        await RoomPrefsStore(prefs_path).set_default_engine(room_id, "opus")
+
+        assert room_id in prefs_path.read_text(encoding="utf-8")
+        store2 = RoomPrefsStore(prefs_path)
+        assert await store2.get_default_engine(room_id) == "opus"
@@ -11,6 +11,7 @@ from takopi_matrix.chat_sessions import (
     MatrixChatSessionStore,
     resolve_chat_sessions_path,
 )
+from takopi_matrix.engine_overrides import EngineOverrides
 from takopi_matrix.thread_state import MatrixThreadStateStore, resolve_thread_state_path
 
 
@@ -152,3 +153,27 @@ async def test_thread_context_set_get_and_clear(tmp_path: Path) -> None:
 
     await store.clear_context(room_id, thread_root)
     assert await store.get_context(room_id, thread_root) is None
+
+
+@pytest.mark.anyio
+async def test_thread_engine_override_update_and_clear(tmp_path: Path) -> None:
+    store = MatrixThreadStateStore(tmp_path / "matrix_thread_state.json")
+    room_id = "!room:example.org"
+    thread_root = "$thread-a:example.org"
+
+    await store.set_engine_override(
+        room_id, thread_root, "codex", EngineOverrides(model="gpt-5")
+    )
+    updated = await store.update_engine_override(
+        room_id,
+        thread_root,
+        "codex",
+        lambda current: EngineOverrides(
+            model=current.model if current else None, reasoning="high"
+        ),
+    )
+    assert updated == EngineOverrides(model="gpt-5", reasoning="high")
+    assert await store.get_engine_override(room_id, thread_root, "codex") == updated
+
+    await store.update_engine_override(room_id, thread_root, "codex", lambda _: None)
+    assert await store.get_engine_override(room_id, thread_root, "codex") is None
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
+import httpx
 import pytest
 
 from takopi_matrix.cli import _build_parser
+from takopi_matrix.verification import send
+from takopi_matrix.verification.send import _claim_missing_sessions, _send_verif
 from takopi_matrix.verify_device import _extract_olm_device, _resolve_creds
 
 
@@ -68,13 +73,14 @@ crypto_store_path = "/tmp/matrix_crypto.db"
         encoding="utf-8",
     )
 
-    def fake_whoami(hs: str, token: str) -> dict[str, str]:
+    def fake_whoami(http: object, hs: str, token: str) -> dict[str, str]:
         assert hs == "https://hs.example"
         assert token == "TOKEN"
         return {"user_id": "@bot:hs.example", "device_id": "DEV123"}
 
     monkeypatch.setattr("takopi_matrix.verification.creds._whoami", fake_whoami)
-    creds = _resolve_creds(cfg)
+    with httpx.Client() as http:
+        creds = _resolve_creds(cfg, http)
     assert creds.user_id == "@bot:hs.example"
     assert creds.device_id == "DEV123"
     assert creds.store_dir.as_posix() == "/tmp"
@@ -83,3 +89,70 @@ crypto_store_path = "/tmp/matrix_crypto.db"
 def test_extract_olm_device_requires_keys() -> None:
     info = {"keys": {"curve25519:DEV": "c"}}
     assert _extract_olm_device("@u:hs", "DEV", info) is None
+
+
+def test_extract_olm_device_picks_keys_by_algorithm() -> None:
+    info = {
+        "keys": {
+            "curve25519:DEV": "c",
+            "ed25519:DEV": "e",
+            "signed_curve25519:AAAA": "s",
+            "ed25519": "no-device-suffix",
+        },
+        "unsigned": {"device_display_name": "Laptop"},
+    }
+    dev = _extract_olm_device("@u:hs", "DEV", info)
+    assert dev is not None
+    assert dev.keys == {"curve25519": "c", "ed25519": "e"}
+    assert dev.display_name == "Laptop"
+
+
+@pytest.mark.anyio
+async def test_claim_missing_sessions_batches_one_request() -> None:
+    claims: list[dict[str, list[str]]] = []
+
+    class _Client:
+        olm = SimpleNamespace(session_store={"have": object()})
+
+        async def keys_claim(self, user_set: dict[str, list[str]]) -> Any:
+            claims.append(user_set)
+
+    targets = [
+        SimpleNamespace(user_id="@a:hs", id="A1", curve25519="have"),
+        SimpleNamespace(user_id="@a:hs", id="A2", curve25519="a2"),
+        SimpleNamespace(user_id="@b:hs", id="B1", curve25519="b1"),
+    ]
+    await _claim_missing_sessions(_Client(), targets, debug_events=False)  # type: ignore
+
+    assert claims == [{"@a:hs": ["A2"], "@b:hs": ["B1"]}]
+
+
+@pytest.mark.anyio
+async def test_send_verif_reports_both_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fail_plain(*args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("plain")
+
+    async def fail_encrypted(*args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("encrypted")
+
+    monkeypatch.setattr(send, "_send_plain", fail_plain)
+    monkeypatch.setattr(send, "_send_encrypted", fail_encrypted)
+    target = SimpleNamespace(user_id="@a:hs", id="A1")
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        await _send_verif(
+            object(),  # type: ignore[arg-type]
+            target,  # type: ignore[arg-type]
+            "m.key.verification.request",
+            {},
+            send_plaintext=True,
+            send_encrypted=True,
+            debug_events=False,
+        )
+
+    assert sorted(str(exc) for exc in excinfo.value.exceptions) == [
+        "encrypted",
+        "plain",
+    ]